@@ -1,21 +1,1743 @@
 import io
+import ast
+import collections
+import concurrent.futures
 import contextlib
+import functools
+import hashlib
+import importlib.util
+import marshal
+import math
+import multiprocessing
+import queue
+import re
+import reprlib
+import shutil
 import sys
 import os
+import textwrap
+import threading
+import time
+import traceback
 
 from PIL import Image
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, QAbstractListModel, QModelIndex, QObject
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QStackedWidget, QLabel, QFileDialog, QMessageBox,
-                             QListWidget, QTextEdit, QLineEdit, QListWidgetItem, QGraphicsOpacityEffect, QScrollArea)
+                             QListWidget, QTextEdit, QLineEdit, QListWidgetItem, QGraphicsOpacityEffect, QScrollArea,
+                             QListView, QPlainTextEdit, QComboBox, QCheckBox, QTableWidget,
+                             QTableWidgetItem, QHeaderView)
 from PyQt5.QtCore import Qt, QSize, QEasingCurve, QRect, QUrl
-from PyQt5.QtGui import QIcon, QFont, QColor
+from PyQt5.QtGui import (QIcon, QFont, QColor, QTextCursor, QImage, QPixmap,
+                         QSyntaxHighlighter, QTextCharFormat)
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
 from PyQt5.QtMultimediaWidgets import QVideoWidget
 from pptx import Presentation
 import pdfplumber
 import pandas as pd
 import json
+import logging
+import logging.handlers
+
+
+class _NullTimer:
+    """关闭统计时使用的空计时器"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Timer:
+    """统计一次操作耗时的计时器，可在执行过程中设置bytes"""
+    __slots__ = ('metrics', 'name', 'bytes', 'start')
+
+    def __init__(self, metrics, name, nbytes):
+        self.metrics = metrics
+        self.name = name
+        self.bytes = nbytes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.name, time.perf_counter() - self.start, self.bytes, exc_type is not None)
+        return False
+
+
+class Metrics:
+    """轻量的性能统计：记录各操作的耗时、次数、错误数和处理字节数
+    关闭时计时器不做任何事，开销可以忽略
+    Lightweight instrumentation of operation latencies and counters
+    """
+    SAMPLE_SIZE = 1000
+    NULL_TIMER = _NullTimer()
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.operations = {}
+        self.counters = collections.Counter()
+        self.gauges = {}
+
+    def timer(self, name, nbytes=0):
+        """返回统计耗时的上下文管理器"""
+        if not self.enabled:
+            return self.NULL_TIMER
+        return _Timer(self, name, nbytes)
+
+    def record(self, name, seconds, nbytes=0, error=False):
+        """记录一次操作"""
+        with self.lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = {
+                    'samples': collections.deque(maxlen=self.SAMPLE_SIZE),
+                    'count': 0, 'errors': 0, 'bytes': 0, 'total_time': 0.0}
+            stats['samples'].append(seconds)
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['bytes'] += nbytes
+            stats['total_time'] += seconds
+
+    def count(self, name, n=1):
+        """累加计数器"""
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += n
+
+    def register_gauge(self, name, func):
+        """注册一个在生成快照时才求值的指标，例如队列长度"""
+        self.gauges[name] = func
+
+    def reset(self):
+        """清空所有统计"""
+        with self.lock:
+            self.operations.clear()
+            self.counters.clear()
+
+    @staticmethod
+    def percentile(sorted_samples, fraction):
+        """最近秩法求百分位数"""
+        if not sorted_samples:
+            return 0.0
+        index = max(0, math.ceil(fraction * len(sorted_samples)) - 1)
+        return sorted_samples[index]
+
+    def snapshot(self):
+        """返回当前统计的字典，可直接保存为JSON"""
+        with self.lock:
+            operations = {}
+            for name, stats in self.operations.items():
+                samples = sorted(stats['samples'])
+                operations[name] = {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'bytes': stats['bytes'],
+                    'total_time': stats['total_time'],
+                    'p50': self.percentile(samples, 0.5),
+                    'p95': self.percentile(samples, 0.95),
+                    'max': samples[-1] if samples else 0.0,
+                }
+            counters = dict(self.counters)
+
+        gauges = {}
+        for name, func in self.gauges.items():
+            try:
+                gauges[name] = func()
+            except Exception:
+                gauges[name] = None
+        cpu_time, memory = process_usage()
+        return {'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"), 'enabled': self.enabled,
+                'cpu_time': cpu_time, 'memory': memory,
+                'operations': operations, 'counters': counters, 'gauges': gauges}
+
+    def export_json(self, path):
+        """把当前统计导出为JSON文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+
+# 全局统计对象，设置环境变量LTK_METRICS=0可在启动时关闭
+metrics = Metrics(enabled=os.environ.get("LTK_METRICS", "1") != "0")
+
+
+def input_size(paths):
+    """返回一个或多个输入文件的总字节数"""
+    if isinstance(paths, str):
+        paths = [paths]
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def instrumented(name):
+    """装饰器：统计工具函数的耗时和第一个参数(输入文件)的大小"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with metrics.timer(name, input_size(args[0]) if args else 0):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 插件编译缓存目录，类似于.py文件的__pycache__
+PLUGIN_CACHE_DIR = "__ltccache__"
+
+
+def parse_plugin_source(content):
+    """解析.ltc文件内容，返回(元数据字典, 代码文本)
+    Parse .ltc content into (metadata, code)
+    """
+    metadata = {}
+    code_lines = []
+    in_metadata = False
+    in_code = False
+
+    for line in content.splitlines():
+        if line.strip() == '[metadata]':
+            in_metadata = True
+            in_code = False
+        elif line.strip() == '[code]':
+            in_metadata = False
+            in_code = True
+        elif in_metadata and '=' in line:
+            key, value = line.split('=', 1)
+            metadata[key.strip()] = value.strip()
+        elif in_code:
+            code_lines.append(line)
+
+    code_lines.append('')
+    return metadata, '\n'.join(code_lines)
+
+
+def plugin_cache_path(plugin_path):
+    """返回插件对应的缓存文件路径
+    Return the cache file path for a plugin
+    """
+    directory, filename = os.path.split(os.path.abspath(plugin_path))
+    return os.path.join(directory, PLUGIN_CACHE_DIR,
+                        f"{filename}.{sys.implementation.cache_tag}.ltcc")
+
+
+def plugin_cache_header(raw):
+    """缓存文件头：Python字节码魔数 + 插件文件内容的哈希"""
+    return importlib.util.MAGIC_NUMBER + hashlib.sha256(raw).digest()
+
+
+def read_plugin_cache(plugin_path, header, with_code=True):
+    """读取有效的插件缓存，返回(元数据, 代码对象)，无效时返回None
+    缓存依次保存元数据和代码对象，只需要元数据时不会反序列化代码
+    """
+    try:
+        with open(plugin_cache_path(plugin_path), 'rb') as f:
+            if f.read(len(header)) != header:
+                return None
+            metadata = marshal.load(f)
+            code = marshal.load(f) if with_code else None
+            return metadata, code
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def load_plugin_metadata(plugin_path):
+    """只读取插件的元数据，不编译代码
+    Read plugin metadata without compiling the code
+    """
+    with open(plugin_path, 'rb') as f:
+        raw = f.read()
+    cached = read_plugin_cache(plugin_path, plugin_cache_header(raw), with_code=False)
+    if cached is not None:
+        return cached[0]
+    return parse_plugin_source(raw.decode('utf-8'))[0]
+
+
+def load_compiled_plugin(plugin_path):
+    """读取插件，返回(元数据字典, 代码对象)
+    缓存以文件内容的哈希和Python版本为键，命中时跳过解析和编译
+    Load a plugin as (metadata, code object), using the on-disk cache when valid
+    """
+    with open(plugin_path, 'rb') as f:
+        raw = f.read()
+    header = plugin_cache_header(raw)
+
+    # 尝试读取缓存
+    cached = read_plugin_cache(plugin_path, header)
+    if cached is not None:
+        return cached
+
+    # 缓存未命中，解析并编译
+    metadata, source = parse_plugin_source(raw.decode('utf-8'))
+    code = compile(source, plugin_path, 'exec')
+
+    # 写入缓存，先写临时文件再替换，避免读到写了一半的缓存
+    cache_path = plugin_cache_path(plugin_path)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            marshal.dump(metadata, f)
+            marshal.dump(code, f)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"写入插件缓存失败: {str(e)}")
+
+    return metadata, code
+
+
+class LazyPlugin:
+    """延迟激活的插件：按元数据创建按钮，首次点击时才编译并执行代码
+    Lazily activated plugin: code is compiled and executed on first use
+    """
+
+    def __init__(self, plugin_path, metadata):
+        self.path = plugin_path
+        self.metadata = metadata
+        self.name = metadata.get('name', '')
+        self.code = None
+        self.main_func = None
+        self.instance = None
+        self.lock = threading.Lock()
+
+    def compile(self):
+        """编译插件代码(线程安全，可在后台调用)"""
+        with self.lock:
+            if self.code is None:
+                self.code = load_compiled_plugin(self.path)[1]
+            return self.code
+
+    def prewarm(self):
+        """按import字段预先导入依赖库并编译代码
+        Pre-import the modules listed in the import field and compile the code
+        """
+        for module_name in self.metadata.get('import', '').split(','):
+            module_name = module_name.strip()
+            if not module_name:
+                continue
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                print(f"插件 {self.name} 预加载 {module_name} 失败: {str(e)}")
+        self.compile()
+
+    def activate(self):
+        """执行插件代码并返回main函数，只在第一次调用时执行"""
+        if self.main_func is None:
+            plugin_globals = {'__file__': self.path}
+            exec(self.compile(), plugin_globals)
+            if 'main' not in plugin_globals:
+                raise ValueError("插件缺少main函数入口")
+            self.main_func = plugin_globals['main']
+        return self.main_func
+
+    def run(self):
+        """运行插件，保留返回的窗口对象以免被回收"""
+        self.instance = self.activate()()
+        return self.instance
+
+
+# 插件商店目录和目录索引缓存
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_STORE_DIRS = [BASE_DIR, os.path.join(BASE_DIR, "plugin_store")]
+PLUGIN_CATALOG_INDEX = os.path.join(BASE_DIR, PLUGIN_CACHE_DIR, "catalog_index.json")
+
+
+def scan_plugin_catalog(directories, index_path=PLUGIN_CATALOG_INDEX):
+    """扫描目录中的.ltc清单，返回插件条目列表
+    文件大小和修改时间未变化的插件直接使用索引中的元数据
+    Scan directories for .ltc manifests, reusing the cached index when unchanged
+    """
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    new_index = {}
+    entries = []
+    for directory in directories:
+        try:
+            files = [entry for entry in os.scandir(directory)
+                     if entry.is_file() and entry.name.endswith('.ltc')]
+        except OSError:
+            continue
+        for file_entry in files:
+            path = os.path.abspath(file_entry.path)
+            stat = file_entry.stat()
+            cached = index.get(path)
+            if cached and cached['mtime'] == stat.st_mtime and cached['size'] == stat.st_size:
+                metadata = cached['metadata']
+            else:
+                try:
+                    metadata = load_plugin_metadata(path)
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"读取插件清单失败: {path} {str(e)}")
+                    continue
+            new_index[path] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'metadata': metadata}
+            if 'name' not in metadata:
+                continue
+            entries.append({
+                "name": metadata['name'],
+                "description": metadata.get('description', ''),
+                "category": metadata.get('category', ''),
+                "version": metadata.get('version', ''),
+                "author": metadata.get('author', ''),
+                "file": path,
+            })
+
+    # 索引有变化时才写回
+    if new_index != index:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(new_index, f, ensure_ascii=False)
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            print(f"写入插件目录索引失败: {str(e)}")
+
+    entries.sort(key=lambda entry: (entry['category'], entry['name']))
+    return entries
+
+
+# 已安装插件目录，启动时扫描
+PLUGIN_INSTALL_DIR = os.path.join(BASE_DIR, "plugins")
+PLUGIN_REQUIRED_FIELDS = ['name', 'version', 'description', 'category']
+
+
+def read_plugin(plugin_path):
+    """读取并检查插件清单，返回LazyPlugin，不合法时抛出ValueError
+    Read and validate a plugin manifest
+    """
+    # 检查文件扩展名
+    if not plugin_path.endswith('.ltc'):
+        raise ValueError(f"不支持的插件格式: {plugin_path}")
+
+    # 只读取元数据，不执行插件代码
+    with metrics.timer("plugin.load", input_size(plugin_path)):
+        metadata = load_plugin_metadata(plugin_path)
+
+    # 验证必填字段
+    for field in PLUGIN_REQUIRED_FIELDS:
+        if field not in metadata:
+            raise ValueError(f"插件缺少必填字段: {field}")
+    return LazyPlugin(plugin_path, metadata)
+
+
+def version_key(version):
+    """把x.y.z形式的版本号转换为可比较的元组"""
+    return tuple(int(part) for part in re.findall(r'\d+', version))
+
+
+def scan_installed_plugins(directory, workers=None):
+    """并行读取目录中的所有插件清单，同名插件保留版本号最高的一个
+    返回({插件名称: LazyPlugin}, [错误信息])
+    Scan an installed-plugins directory in parallel
+    """
+    try:
+        paths = sorted(entry.path for entry in os.scandir(directory)
+                       if entry.is_file() and entry.name.endswith('.ltc'))
+    except OSError:
+        return {}, []
+
+    def try_read(path):
+        try:
+            return read_plugin(path), None
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            return None, f"加载插件失败: {path} {str(e)}"
+
+    plugins = {}
+    errors = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for plugin, error in executor.map(try_read, paths):
+            if plugin is None:
+                errors.append(error)
+                continue
+            existing = plugins.get(plugin.name)
+            if existing is None or version_key(plugin.metadata['version']) > version_key(existing.metadata['version']):
+                plugins[plugin.name] = plugin
+    return plugins, errors
+
+
+# 独立进程插件的心跳间隔和判定为卡死的超时时间(秒)
+PLUGIN_HOST_HEARTBEAT = 1.0
+PLUGIN_HOST_TIMEOUT = 10.0
+# 插件界面线程的事件循环停止响应多久视为卡死，插件可以用hang_timeout字段修改
+PLUGIN_HOST_HANG_TIMEOUT = 60.0
+PLUGIN_HOST_MAX_RESTARTS = 3
+
+
+def process_usage(pid=None):
+    """返回进程的(CPU时间秒数, 内存字节数)，pid为空时为当前进程
+    优先使用psutil，未安装时退回到标准库
+    """
+    try:
+        import psutil
+        proc = psutil.Process(pid)
+        cpu = proc.cpu_times()
+        return cpu.user + cpu.system, proc.memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        # 进程已退出
+        return 0.0, 0
+    if pid is not None:
+        try:
+            # 没有psutil时在Linux上从/proc读取其他进程的占用
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            with open(f"/proc/{pid}/statm") as f:
+                rss_pages = int(f.read().split()[1])
+            ticks = os.sysconf('SC_CLK_TCK')
+            return (int(fields[11]) + int(fields[12])) / ticks, rss_pages * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError, AttributeError):
+            return 0.0, 0
+    try:
+        import resource
+        # Linux上ru_maxrss的单位是KB
+        return time.process_time(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return time.process_time(), 0
+
+
+def plugin_host_main(plugin_path, conn):
+    """插件宿主进程入口：在独立进程中运行插件，并通过管道发送心跳
+    心跳由单独的线程发送，并带上界面线程事件循环最后一次响应距今的秒数，
+    主进程据此区分进程冻结和插件在界面线程中卡住
+    Plugin host process entry point
+    """
+    app = QApplication(sys.argv)
+    plugin = LazyPlugin(plugin_path, load_plugin_metadata(plugin_path))
+    send_lock = threading.Lock()
+    stop_requested = threading.Event()
+    last_tick = [time.monotonic()]
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    def heartbeat():
+        while not stop_requested.is_set():
+            try:
+                # 处理主进程发来的命令
+                if conn.poll(PLUGIN_HOST_HEARTBEAT):
+                    if conn.recv()[0] == 'stop':
+                        stop_requested.set()
+                        return
+                send(('heartbeat', time.monotonic() - last_tick[0]))
+            except (EOFError, OSError):
+                # 主进程已退出，界面线程可能正忙，直接结束进程
+                os._exit(0)
+
+    def tick():
+        # 在界面线程中执行，记录事件循环仍在响应
+        last_tick[0] = time.monotonic()
+        if stop_requested.is_set():
+            app.quit()
+
+    def start():
+        try:
+            plugin.run()
+            send(('started',))
+        except Exception as e:
+            send(('error', str(e)))
+            app.quit()
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    # 退出请求由心跳线程收到，在界面线程中执行
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(200)
+    QTimer.singleShot(0, start)
+    app.exec_()
+    stop_requested.set()
+    conn.close()
+
+
+class PluginHost:
+    """在独立进程中运行插件，主进程通过管道与之通信
+    Runs a plugin in a separate process and talks to it over a pipe
+    """
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+        self.cpu_time = 0.0
+        self.memory = 0
+        self.last_heartbeat = 0.0
+        self.event_loop_lag = 0.0
+        self.error = None
+        try:
+            self.hang_timeout = float(plugin.metadata.get('hang_timeout', PLUGIN_HOST_HANG_TIMEOUT))
+        except ValueError:
+            self.hang_timeout = PLUGIN_HOST_HANG_TIMEOUT
+
+    def start(self):
+        """启动宿主进程"""
+        if self.conn is not None:
+            self.conn.close()
+        # 使用spawn启动全新的进程，fork会复制主进程中正在运行的QApplication
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=plugin_host_main, args=(self.plugin.path, child_conn), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.last_heartbeat = time.monotonic()
+        self.event_loop_lag = 0.0
+        self.error = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def poll(self):
+        """读取宿主进程发来的所有消息，并在主进程中统计其资源占用"""
+        try:
+            while self.conn is not None and self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == 'heartbeat':
+                    self.last_heartbeat = time.monotonic()
+                    self.event_loop_lag = message[1]
+                elif message[0] == 'error':
+                    self.error = message[1]
+        except (EOFError, OSError):
+            self.conn = None
+        if self.is_alive():
+            self.cpu_time, self.memory = process_usage(self.process.pid)
+
+    def is_hung(self):
+        """进程超过超时时间没有心跳，或界面线程超过hang_timeout没有响应，即视为卡死
+        插件在main()中做耗时工作时，在hang_timeout之内不会被重启
+        """
+        if not self.is_alive():
+            return False
+        if time.monotonic() - self.last_heartbeat > PLUGIN_HOST_TIMEOUT:
+            return True
+        return self.event_loop_lag > self.hang_timeout
+
+    def stop(self, timeout=2):
+        """先请求宿主退出，超时后强制结束"""
+        if self.process is None:
+            return
+        try:
+            if self.conn is not None:
+                self.conn.send(('stop',))
+        except (EOFError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        if self.conn is not None:
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def restart(self):
+        """重启卡死的宿主进程"""
+        self.restarts += 1
+        self.stop(timeout=0)
+        self.start()
+
+
+def estimate_size(value):
+    """粗略估计提取结果占用的内存字节数"""
+    if isinstance(value, str):
+        return 50 + len(value) * 2
+    if isinstance(value, (list, tuple)):
+        return 56 + 8 * len(value) + sum(estimate_size(item) for item in value)
+    return 16
+
+
+class PdfDocumentCache:
+    """本次运行内共享的PDF解析结果缓存，按内存占用上限LRU淘汰
+    多个工具处理同一份PDF时，每页只解析一次
+    Per-session LRU cache of parsed PDF pages shared by the PDF tools
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.documents = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.total = 0
+
+    def key(self, pdf_path):
+        """文件修改后键随之变化，旧版本的解析结果不会被使用"""
+        stat = os.stat(pdf_path)
+        return os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size
+
+    def entry(self, pdf_path):
+        """取得文档的缓存条目，并标记为最近使用"""
+        key = self.key(pdf_path)
+        with self.lock:
+            entry = self.documents.get(key)
+            if entry is None:
+                # 同一路径的旧版本不会再用到
+                for stale in [k for k in self.documents if k[0] == key[0]]:
+                    self.drop(stale)
+                entry = {'pages': {}, 'page_count': None, 'size': 0, 'lock': threading.Lock()}
+                self.documents[key] = entry
+            self.documents.move_to_end(key)
+        return key, entry
+
+    def drop(self, key):
+        entry = self.documents.pop(key)
+        self.total -= entry['size']
+
+    def page_count(self, pdf_path):
+        """返回PDF的页数"""
+        key, entry = self.entry(pdf_path)
+        if entry['page_count'] is None:
+            with entry['lock'], pdfplumber.open(pdf_path) as pdf_file:
+                entry['page_count'] = len(pdf_file.pages)
+        return entry['page_count']
+
+    def extract(self, pdf_path, kind, pages=None):
+        """逐页生成(页序号, 提取结果)，kind为'tables'或'text'
+        已缓存的页直接返回，其余页只打开一次PDF依次解析
+        """
+        key, entry = self.entry(pdf_path)
+        pages = range(self.page_count(pdf_path)) if pages is None else pages
+        pdf_file = None
+        try:
+            for page_index in pages:
+                result = entry['pages'].get((page_index, kind))
+                if result is not None:
+                    metrics.count("pdf_cache.hit")
+                else:
+                    metrics.count("pdf_cache.miss")
+                    with entry['lock']:
+                        if pdf_file is None:
+                            pdf_file = pdfplumber.open(pdf_path)
+                        page = pdf_file.pages[page_index]
+                        result = page.extract_tables() if kind == 'tables' else (page.extract_text() or "")
+                        # 释放页面解析出的对象，只保留提取结果
+                        page.flush_cache()
+                    self.store(key, entry, (page_index, kind), result)
+                yield page_index, result
+        finally:
+            if pdf_file is not None:
+                pdf_file.close()
+
+    def tables(self, pdf_path, page_index):
+        """返回某一页的全部表格"""
+        return next(self.extract(pdf_path, 'tables', [page_index]))[1]
+
+    def text(self, pdf_path, page_index):
+        """返回某一页的文本"""
+        return next(self.extract(pdf_path, 'text', [page_index]))[1]
+
+    def store(self, key, entry, page_key, result):
+        """保存一页的提取结果，超过上限时淘汰最久未使用的文档，
+        只剩一个文档时淘汰该文档最早缓存的页
+        """
+        size = estimate_size(result)
+        with self.lock:
+            if page_key in entry['pages'] or size > self.max_bytes:
+                return
+            entry['pages'][page_key] = result
+            entry['size'] += size
+            if key in self.documents:
+                self.total += size
+            while self.total > self.max_bytes and self.documents:
+                if len(self.documents) > 1:
+                    self.drop(next(iter(self.documents)))
+                    continue
+                only = next(iter(self.documents.values()))
+                if not only['pages']:
+                    break
+                oldest = next(iter(only['pages']))
+                freed = estimate_size(only['pages'].pop(oldest))
+                only['size'] -= freed
+                self.total -= freed
+
+    def clear(self):
+        with self.lock:
+            self.documents.clear()
+            self.total = 0
+
+
+pdf_cache = PdfDocumentCache()
+metrics.register_gauge("pdf_cache_bytes", lambda: pdf_cache.total)
+
+
+@contextlib.contextmanager
+def atomic_output(path):
+    """先写入同目录下的临时文件，完成后原子替换为目标文件
+    中断时目标文件要么不存在，要么是上一次的完整版本
+    临时文件的扩展名是.partial，不会被按扩展名查找的地方当成完整文件，
+    写入时需要显式指定格式
+    Write to a temporary file and os.replace it onto the target on success
+    """
+    temp_path = f"{path}.partial"
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+class ConversionCheckpoint:
+    """记录转换中已完成的页、帧或工作表，保存在输出目录中
+    中断后对同一源文件重新运行时跳过已完成的部分，全部完成后删除
+    Resumable progress record for conversions that write many outputs
+    """
+    SAVE_INTERVAL = 0.5
+
+    def __init__(self, output_dir, tool, sources, options=None):
+        self.path = os.path.join(output_dir, f".{tool}.checkpoint.json")
+        if isinstance(sources, str):
+            sources = [sources]
+        # 源文件或参数变化后旧的进度不再有效
+        signature = {'tool': tool, 'options': options or {},
+                     'sources': [[os.path.abspath(path), os.stat(path).st_mtime_ns,
+                                  os.path.getsize(path)] for path in sources]}
+        self.signature = json.loads(json.dumps(signature))
+        self.completed = {}
+        # {分组: [条目]}，例如PDF的一页包含哪些表格，整组完成时可跳过解析
+        self.groups = {}
+        self.last_save = 0
+        # 流水线的数据源和输出阶段在不同线程中更新进度
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('signature') == self.signature:
+                self.completed = data['completed']
+                self.groups = data.get('groups', {})
+        except (OSError, ValueError, KeyError):
+            pass
+        self.resumed = len(self.completed)
+        # 本次运行中失败的条目，有失败时保留进度文件
+        self.failed = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 只有全部条目都完成时才删除进度文件
+        if exc_type is None and not self.failed:
+            self.finish()
+        else:
+            self.save()
+
+    def done(self, item):
+        """该条目是否已完成且输出文件仍然存在"""
+        output = self.completed.get(str(item))
+        return output is not None and os.path.exists(output)
+
+    def fail(self, item):
+        """记录一个失败的条目"""
+        self.failed.add(str(item))
+
+    def expect(self, group, items):
+        """记录一个分组包含的条目"""
+        with self.lock:
+            self.groups[str(group)] = [str(item) for item in items]
+
+    def group_done(self, group):
+        """分组是否已记录且其中的条目全部完成"""
+        items = self.groups.get(str(group))
+        return items is not None and all(self.done(item) for item in items)
+
+    def mark(self, item, output):
+        """记录一个已完成的条目，写盘频率有上限"""
+        with self.lock:
+            self.completed[str(item)] = output
+        if time.monotonic() - self.last_save >= self.SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        """保存进度，进度文件本身也原子替换"""
+        self.last_save = time.monotonic()
+        try:
+            with self.lock, atomic_output(self.path) as temp_path:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'signature': self.signature, 'completed': self.completed,
+                               'groups': self.groups}, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"保存转换进度失败: {str(e)}")
+
+    def finish(self):
+        """转换全部完成，删除进度文件"""
+        with contextlib.suppress(OSError):
+            os.remove(self.path)
+
+
+# 以下是各个工具的核心实现，不依赖界面，可在后台线程或命令行中调用
+@instrumented("convert_pdf_to_excel")
+def pdf_to_excel(pdf_path, output_path):
+    """提取PDF第一页的第一个表格并保存为Excel，返回表格行数，没有表格时返回0
+    Extract the first table of a PDF into an Excel file
+    """
+    tables = pdf_cache.tables(pdf_path, 0)
+    if not tables:
+        return 0
+    df = pd.DataFrame(tables[0])
+    # 传入文件对象，pandas不会按.partial扩展名检查格式
+    with atomic_output(output_path) as temp_path, open(temp_path, 'wb') as f:
+        df.to_excel(f, index=False, engine=excel_writer_engine())
+    return len(df)
+
+
+@instrumented("convert_pdf_to_word")
+def pdf_to_word(pdf_path, output_path):
+    """将PDF文件转换为Word文件
+    Convert a PDF file to a Word document
+    """
+    from pdf2docx import Converter
+
+    cv = Converter(pdf_path)
+    try:
+        with atomic_output(output_path) as temp_path:
+            cv.convert(temp_path, start=0, end=None)
+    finally:
+        cv.close()
+
+
+@instrumented("split_excel_sheets")
+def split_excel_file(excel_path, output_path, log=None):
+    """把Excel的每个工作表保存为单独的.xlsx文件，返回生成的文件列表
+    中断后重新运行时跳过已保存的工作表，有工作表保存失败时在全部处理完后抛出异常
+    Split every sheet of a workbook into its own .xlsx file
+    """
+    import openpyxl
+
+    outputs = []
+    failed = []
+    # 根据文件扩展名选择不同的处理方式
+    if excel_path.lower().endswith('.xlsx'):
+        # 读取.xlsx文件
+        wb = openpyxl.load_workbook(excel_path)
+        sheets = [(name, (tuple(cell.value for cell in row) for row in wb[name].iter_rows()))
+                  for name in wb.sheetnames]
+    elif excel_path.lower().endswith('.xls'):
+        import xlrd
+        # 读取.xls文件
+        wb = xlrd.open_workbook(excel_path)
+        sheets = [(sheet.name, map(sheet.row_values, range(sheet.nrows)))
+                  for sheet in wb.sheets()]
+    else:
+        raise ValueError("不支持的文件格式，请使用.xls或.xlsx文件")
+
+    with ConversionCheckpoint(output_path, "split_excel", excel_path) as checkpoint:
+        if checkpoint.resumed and log:
+            log(f"继续上次中断的拆分，已完成 {checkpoint.resumed} 个工作表")
+        # 遍历每个工作表并保存为单独文件
+        for sheet_name, rows in sheets:
+            output_file = os.path.join(output_path, f"{sheet_name}.xlsx")
+            if checkpoint.done(sheet_name):
+                outputs.append(output_file)
+                continue
+            try:
+                # 创建新工作簿并复制数据
+                new_wb = openpyxl.Workbook()
+                new_sheet = new_wb.active
+                for row in rows:
+                    new_sheet.append(row)
+
+                # 保存文件
+                with atomic_output(output_file) as temp_path:
+                    new_wb.save(temp_path)
+                checkpoint.mark(sheet_name, output_file)
+                outputs.append(output_file)
+                if log:
+                    log(f"已保存工作表 {sheet_name} 到 {output_file}")
+            except Exception as e:
+                failed.append(sheet_name)
+                checkpoint.fail(sheet_name)
+                if log:
+                    log(f"保存工作表 {sheet_name} 失败: {str(e)}", logging.ERROR)
+        # 不完整的结果不能当成成功，否则会被写入转换结果缓存
+        if failed:
+            raise RuntimeError(f"{len(failed)} 个工作表保存失败: {', '.join(map(str, failed))}")
+    return outputs
+
+
+def excel_writer_engine():
+    """优先使用写入速度更快的xlsxwriter"""
+    try:
+        import xlsxwriter  # noqa: F401
+        return 'xlsxwriter'
+    except ImportError:
+        return 'openpyxl'
+
+
+def write_partition(df, output_file, engine):
+    """把一个分区写入.xlsx文件，在进程池中调用"""
+    with atomic_output(output_file) as temp_path, open(temp_path, 'wb') as f:
+        df.to_excel(f, index=False, engine=engine)
+    return output_file
+
+
+def safe_filename(value):
+    """把任意值转换为可用作文件名的字符串"""
+    if pd.isna(value):
+        return "空"
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', str(value)).strip('_') or "空"
+
+
+@instrumented("partition_excel")
+def partition_excel_file(excel_path, output_path, rows_per_file=None, column=None,
+                         sheet_name=0, workers=None, log=None):
+    """按行数或按某一列的值把一个工作表拆分为多个.xlsx文件，返回生成的文件列表
+    使用pandas整列操作划分分区，分区在多个进程中并行写入
+    Partition one sheet by row count or by column value
+    """
+    if not rows_per_file and not column:
+        raise ValueError("请指定每个文件的行数或用于拆分的列名")
+
+    df = pd.read_excel(excel_path, sheet_name=sheet_name)
+    base = os.path.splitext(os.path.basename(excel_path))[0]
+
+    if rows_per_file:
+        rows_per_file = int(rows_per_file)
+        if rows_per_file <= 0:
+            raise ValueError("每个文件的行数必须为正整数")
+        partitions = [(f"{base}_part{i // rows_per_file + 1}.xlsx", df.iloc[i:i + rows_per_file])
+                      for i in range(0, len(df), rows_per_file)]
+    else:
+        if column not in df.columns:
+            raise ValueError(f"工作表中没有列: {column}")
+        partitions = []
+        used_names = collections.Counter()
+        for key, group in df.groupby(column, sort=False, dropna=False):
+            # 不同的值清理后可能得到相同的文件名，重名时加序号
+            name = safe_filename(key)
+            used_names[name] += 1
+            if used_names[name] > 1:
+                name = f"{name}_{used_names[name]}"
+            partitions.append((f"{base}_{name}.xlsx", group))
+
+    if log:
+        log(f"共 {len(df)} 行，拆分为 {len(partitions)} 个文件")
+
+    engine = excel_writer_engine()
+    outputs = []
+    targets = [(os.path.join(output_path, name), part) for name, part in partitions]
+    if len(targets) <= 1 or workers == 1:
+        for output_file, part in targets:
+            outputs.append(write_partition(part, output_file, engine))
+    else:
+        # 写xlsx受GIL限制，使用进程池并行写入
+        # 使用spawn启动，fork会复制界面进程中正在运行的其他线程持有的锁
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(write_partition, part, output_file, engine)
+                       for output_file, part in targets]
+            for future in concurrent.futures.as_completed(futures):
+                outputs.append(future.result())
+                if log:
+                    log(f"已保存 {outputs[-1]}", logging.DEBUG)
+    return sorted(outputs)
+
+
+@instrumented("split_gif_frames")
+def split_gif_file(gif_path, output_path, log=None):
+    """把GIF的每一帧保存为PNG，返回帧数
+    中断后重新运行时跳过已保存的帧
+    Save every frame of a GIF as a PNG file
+    """
+    with Image.open(gif_path) as gif, \
+            ConversionCheckpoint(output_path, "split_gif", gif_path) as checkpoint:
+        if checkpoint.resumed and log:
+            log(f"继续上次中断的拆分，已完成 {checkpoint.resumed} 帧")
+        for i in range(gif.n_frames):
+            frame_path = os.path.join(output_path, f"frame_{i}.png")
+            if checkpoint.done(i):
+                continue
+            gif.seek(i)
+            with atomic_output(frame_path) as temp_path:
+                gif.save(temp_path, format='PNG')
+            checkpoint.mark(i, frame_path)
+            if log:
+                log(f"已保存第 {i} 帧到 {frame_path}", logging.DEBUG)
+        return gif.n_frames
+
+
+@instrumented("merge_images_to_gif")
+def merge_images(image_paths, output_path, interval):
+    """把多张图片合并为GIF，interval为帧间隔(毫秒)
+    Merge images into a GIF
+    """
+    images = [Image.open(path) for path in image_paths]
+    try:
+        with atomic_output(output_path) as temp_path:
+            images[0].save(temp_path, format='GIF', save_all=True, append_images=images[1:],
+                           loop=0, duration=interval)
+    finally:
+        for image in images:
+            image.close()
+
+
+# 转换结果缓存中各工具的版本，修改转换实现后增加对应的版本号，旧的缓存结果不再使用
+RESULT_CACHE_VERSIONS = {
+    "pdf_to_excel": 1,
+    "pdf_to_word": 1,
+    "split_excel": 1,
+    "partition_excel": 1,
+    "split_gif": 1,
+    "merge_images": 1,
+}
+
+
+class ResultCache:
+    """以源文件内容哈希、工具名和参数为键的转换结果缓存，按LRU淘汰
+    Content-addressed cache of conversion outputs with size-bounded LRU eviction
+    """
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024, use_hardlinks=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # 硬链接更快，但修改输出文件会同时修改缓存中的文件，因此默认复制
+        self.use_hardlinks = use_hardlinks
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hash_memo = {}
+        try:
+            with open(os.path.join(directory, self.INDEX_FILE), 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def file_hash(self, path):
+        """计算文件内容的SHA-256，文件未修改时复用上次的结果"""
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+        digest = self.hash_memo.get(memo_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(chunk)
+            digest = self.hash_memo[memo_key] = sha.hexdigest()
+        return digest
+
+    def key(self, source_paths, tool, options=None):
+        """根据源文件内容、工具名、工具版本和参数生成缓存键"""
+        if isinstance(source_paths, str):
+            source_paths = [source_paths]
+        payload = json.dumps({'sources': [self.file_hash(path) for path in source_paths],
+                              'tool': tool, 'version': RESULT_CACHE_VERSIONS.get(tool, 0),
+                              'options': options or {}}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def entry_dir(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def save_index(self):
+        """保存索引，调用方需持有锁"""
+        os.makedirs(self.directory, exist_ok=True)
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        temp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(temp_path, index_path)
+
+    def place(self, src, dst):
+        """把缓存文件放到目标位置，优先硬链接，完成后才替换目标文件"""
+        with atomic_output(dst) as temp_path:
+            if self.use_hardlinks:
+                try:
+                    os.link(src, temp_path)
+                    return
+                except OSError:
+                    pass
+            shutil.copyfile(src, temp_path)
+
+    def restore(self, key, targets=None, output_dir=None):
+        """命中时把缓存的文件放到目标位置并返回条目，未命中返回None
+        targets为{缓存中的文件名: 目标路径}；只给output_dir时全部文件放到该目录
+        """
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                self.misses += 1
+                metrics.count("result_cache.miss")
+                return None
+            entry['last_used'] = time.time()
+            self.hits += 1
+            try:
+                self.save_index()
+            except OSError:
+                pass
+        metrics.count("result_cache.hit")
+
+        if targets is None:
+            targets = {name: os.path.join(output_dir, name) for name in entry['files']}
+        try:
+            for name, dst in targets.items():
+                self.place(os.path.join(self.entry_dir(key), name), dst)
+        except OSError:
+            # 缓存文件已损坏或被删除，当作未命中
+            self.invalidate(key)
+            return None
+        return entry
+
+    def store(self, key, files, result=None, source=""):
+        """保存转换结果，files为{缓存中的文件名: 输出文件路径}"""
+        if not self.enabled or not all(os.path.exists(path) for path in files.values()):
+            return
+        entry_dir = self.entry_dir(key)
+        temp_dir = f"{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            os.makedirs(temp_dir)
+            size = 0
+            for name, path in files.items():
+                shutil.copyfile(path, os.path.join(temp_dir, name))
+                size += os.path.getsize(path)
+            with self.lock:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(temp_dir, entry_dir)
+                self.index[key] = {'files': list(files), 'result': result, 'size': size,
+                                   'source': source, 'last_used': time.time()}
+                self.evict()
+                self.save_index()
+        except (OSError, TypeError) as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            print(f"写入转换结果缓存失败: {str(e)}")
+
+    def evict(self):
+        """按最近使用时间淘汰条目，直到总大小不超过上限，调用方需持有锁"""
+        total = sum(entry['size'] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.index.pop(key)['size']
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+
+    def invalidate(self, key=None):
+        """删除一个条目，不指定时清空全部缓存"""
+        with self.lock:
+            keys = [key] if key is not None else list(self.index)
+            for k in keys:
+                self.index.pop(k, None)
+                shutil.rmtree(self.entry_dir(k), ignore_errors=True)
+            try:
+                self.save_index()
+            except OSError:
+                pass
+
+    def stats(self):
+        """返回缓存统计"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {'entries': len(self.index),
+                    'bytes': sum(entry['size'] for entry in self.index.values()),
+                    'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': self.hits / total if total else 0.0}
+
+
+# 全局转换结果缓存
+result_cache = ResultCache(os.path.join(BASE_DIR, PLUGIN_CACHE_DIR, "results"))
+
+
+def cached_file_conversion(tool, func, sources, output_path, **options):
+    """带缓存地执行只有一个输出文件的转换，返回(转换结果, 是否命中缓存)
+    Run a single-output conversion through the result cache
+    """
+    if not result_cache.enabled:
+        return func(sources, output_path, **options), False
+    key = result_cache.key(sources, tool, options)
+    cached_name = "output" + os.path.splitext(output_path)[1]
+    entry = result_cache.restore(key, {cached_name: output_path})
+    if entry is not None:
+        return entry['result'], True
+    result = func(sources, output_path, **options)
+    result_cache.store(key, {cached_name: output_path}, result, str(sources))
+    return result, False
+
+
+def cached_dir_conversion(tool, func, source, output_dir, list_outputs, log=None, **options):
+    """带缓存地执行输出多个文件到目录的转换，返回(转换结果, 是否命中缓存)
+    list_outputs根据转换结果返回生成的文件路径列表
+    Run a directory-output conversion through the result cache
+    """
+    if not result_cache.enabled:
+        return func(source, output_dir, log=log, **options), False
+    key = result_cache.key(source, tool, options)
+    entry = result_cache.restore(key, output_dir=output_dir)
+    if entry is not None:
+        result = entry['result']
+        # 缓存中的输出路径指向当初的目录，换成本次的输出目录
+        if isinstance(result, list):
+            result = [os.path.join(output_dir, os.path.basename(path)) for path in result]
+        return result, True
+    result = func(source, output_dir, log=log, **options)
+    outputs = list_outputs(result)
+    result_cache.store(key, {os.path.basename(path): path for path in outputs}, result, source)
+    return result, False
+
+
+class ThumbnailCache:
+    """磁盘缩略图缓存，以文件路径、修改时间、大小和帧号为键，按LRU淘汰
+    On-disk thumbnail cache keyed by path, mtime, size and frame
+    """
+
+    # 保持打开的源文件数，继续浏览同一个GIF时不必从第一帧重新解码
+    MAX_DECODERS = 4
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total = None
+        self.decoders = collections.OrderedDict()
+
+    def source_key(self, path):
+        """源文件的标识，文件修改后随之变化"""
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    def key(self, source_key, frame, size):
+        """生成缓存键"""
+        return hashlib.sha1(f"{source_key}|{frame}|{size}".encode('utf-8')).hexdigest()
+
+    def thumbnails(self, path, frames, size=96):
+        """逐个生成(帧号, 缩略图文件路径)
+        缓存中没有的帧按帧号顺序在一次遍历中解码，GIF定位到某一帧需要解码之前的所有帧
+        """
+        source_key = self.source_key(path)
+        missing = []
+        for frame in sorted(frames):
+            cache_path = os.path.join(self.directory, self.key(source_key, frame, size) + ".png")
+            try:
+                # 更新修改时间作为最近使用时间
+                os.utime(cache_path)
+                yield frame, cache_path
+            except OSError:
+                missing.append((frame, cache_path))
+        if not missing:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self.decoder(path, source_key) as image:
+            for frame, cache_path in missing:
+                if image.tell() != frame:
+                    image.seek(frame)
+                thumb = image.convert('RGBA')
+                thumb.thumbnail((size, size))
+                temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+                thumb.save(temp_path, format='PNG')
+                os.replace(temp_path, cache_path)
+                self.added(os.path.getsize(cache_path))
+                yield frame, cache_path
+
+    @contextlib.contextmanager
+    def decoder(self, path, source_key):
+        """取出一个打开的源文件独占使用，用完后放回，向后浏览时从当前帧继续解码"""
+        with self.lock:
+            image = self.decoders.pop(source_key, None)
+        if image is None:
+            image = Image.open(path)
+        try:
+            yield image
+        except BaseException:
+            image.close()
+            raise
+        with self.lock:
+            if source_key in self.decoders:
+                # 其他线程已经放回了同一个文件
+                image.close()
+                return
+            self.decoders[source_key] = image
+            while len(self.decoders) > self.MAX_DECODERS:
+                self.decoders.popitem(last=False)[1].close()
+
+    def added(self, nbytes):
+        """记录新增的缓存大小，超过上限时淘汰最久未使用的缩略图"""
+        with self.lock:
+            if self.total is None:
+                self.total = sum(entry.stat().st_size for entry in os.scandir(self.directory))
+            else:
+                self.total += nbytes
+            if self.total <= self.max_bytes:
+                return
+            entries = sorted(os.scandir(self.directory), key=lambda entry: entry.stat().st_mtime)
+            # 淘汰到上限的八成，避免每次新增都要排序
+            for entry in entries:
+                if self.total <= self.max_bytes * 0.8:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                    self.total -= size
+                except OSError:
+                    pass
+
+
+# 流水线的各个阶段：{名称: 阶段说明}
+# 数据源阶段产生数据流，中间阶段转换数据流，输出阶段消费数据流并返回处理的条目数
+# 数据流中的每一项都是(名称, 数据)，table的数据是行列表，frame的数据是PIL图像
+PIPELINE_STAGES = {}
+
+
+def pipeline_stage(name, label, role, accepts=None, produces=None, resumable=False):
+    """注册流水线阶段的装饰器，resumable表示阶段支持checkpoint参数"""
+    def decorator(func):
+        PIPELINE_STAGES[name] = {'name': name, 'label': label, 'role': role,
+                                 'accepts': accepts, 'produces': produces,
+                                 'resumable': resumable, 'func': func}
+        return func
+    return decorator
+
+
+@pipeline_stage("pdf_tables", "PDF表格", "source", produces="table", resumable=True)
+def pipeline_pdf_tables(pdf_path, checkpoint=None):
+    """逐页提取PDF中的所有表格，解析结果与其他PDF工具共享
+    checkpoint中已全部写出的页不再解析
+    """
+    pages = range(pdf_cache.page_count(pdf_path))
+    if checkpoint:
+        pages = [i for i in pages if not checkpoint.group_done(f"page{i + 1}")]
+    for page_index, tables in pdf_cache.extract(pdf_path, 'tables', pages):
+        names = [f"page{page_index + 1}_table{table_no}" for table_no in range(1, len(tables) + 1)]
+        if checkpoint:
+            checkpoint.expect(f"page{page_index + 1}", names)
+        yield from zip(names, tables)
+
+
+@pipeline_stage("excel_sheets", "Excel工作表", "source", produces="table")
+def pipeline_excel_sheets(excel_path):
+    """逐个读取Excel工作表"""
+    if excel_path.lower().endswith('.xlsx'):
+        import openpyxl
+        wb = openpyxl.load_workbook(excel_path, read_only=True)
+        try:
+            for sheet_name in wb.sheetnames:
+                yield sheet_name, [list(row) for row in wb[sheet_name].iter_rows(values_only=True)]
+        finally:
+            wb.close()
+    elif excel_path.lower().endswith('.xls'):
+        import xlrd
+        wb = xlrd.open_workbook(excel_path)
+        for sheet in wb.sheets():
+            yield sheet.name, [sheet.row_values(i) for i in range(sheet.nrows)]
+    else:
+        raise ValueError("不支持的文件格式，请使用.xls或.xlsx文件")
+
+
+@pipeline_stage("gif_frames", "GIF帧", "source", produces="frame")
+def pipeline_gif_frames(gif_path):
+    """逐帧读取GIF"""
+    with Image.open(gif_path) as gif:
+        for i in range(gif.n_frames):
+            gif.seek(i)
+            yield f"frame_{i}", gif.copy()
+
+
+@pipeline_stage("images", "图片", "source", produces="frame")
+def pipeline_images(image_paths):
+    """逐张读取图片"""
+    if isinstance(image_paths, str):
+        image_paths = [image_paths]
+    for path in image_paths:
+        with Image.open(path) as image:
+            image.load()
+            yield os.path.splitext(os.path.basename(path))[0], image.copy()
+
+
+@pipeline_stage("drop_empty_rows", "删除空行", "transform", accepts="table", produces="table")
+def pipeline_drop_empty_rows(tables):
+    """删除所有单元格都为空的行"""
+    for name, rows in tables:
+        yield name, [row for row in rows if any(cell not in (None, '') for cell in row)]
+
+
+@pipeline_stage("resize_frames", "缩放图片", "transform", accepts="frame", produces="frame")
+def pipeline_resize_frames(frames, scale=0.5):
+    """按比例缩放每一帧"""
+    for name, frame in frames:
+        size = (max(1, int(frame.width * scale)), max(1, int(frame.height * scale)))
+        yield name, frame.resize(size)
+
+
+@pipeline_stage("write_sheets", "每个表格保存为单独的Excel", "sink", accepts="table", resumable=True)
+def pipeline_write_sheets(tables, output_dir, checkpoint=None):
+    """每个表格保存为单独的.xlsx文件，跳过checkpoint中已完成的表格"""
+    import openpyxl
+
+    count = 0
+    for name, rows in tables:
+        count += 1
+        if checkpoint and checkpoint.done(name):
+            continue
+        wb = openpyxl.Workbook(write_only=True)
+        sheet = wb.create_sheet(name[:31])
+        for row in rows:
+            sheet.append(row)
+        output_file = os.path.join(output_dir, f"{name}.xlsx")
+        with atomic_output(output_file) as temp_path:
+            wb.save(temp_path)
+        if checkpoint:
+            checkpoint.mark(name, output_file)
+    return count
+
+
+@pipeline_stage("write_workbook", "所有表格保存到一个Excel", "sink", accepts="table")
+def pipeline_write_workbook(tables, output_path):
+    """所有表格作为工作表保存到一个.xlsx文件"""
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    count = 0
+    for name, rows in tables:
+        # Excel工作表名最长31个字符
+        sheet = wb.create_sheet(name[:31])
+        for row in rows:
+            sheet.append(row)
+        count += 1
+    if count:
+        with atomic_output(output_path) as temp_path:
+            wb.save(temp_path)
+    return count
+
+
+@pipeline_stage("write_frames", "每一帧保存为PNG", "sink", accepts="frame", resumable=True)
+def pipeline_write_frames(frames, output_dir, checkpoint=None):
+    """每一帧保存为PNG文件，跳过checkpoint中已完成的帧"""
+    count = 0
+    for name, frame in frames:
+        count += 1
+        if checkpoint and checkpoint.done(name):
+            continue
+        output_file = os.path.join(output_dir, f"{name}.png")
+        with atomic_output(output_file) as temp_path:
+            frame.save(temp_path, format='PNG')
+        if checkpoint:
+            checkpoint.mark(name, output_file)
+    return count
+
+
+@pipeline_stage("write_gif", "合并为GIF", "sink", accepts="frame")
+def pipeline_write_gif(frames, output_path, interval=100):
+    """所有帧合并为一个GIF"""
+    images = [frame for _, frame in frames]
+    if images:
+        with atomic_output(output_path) as temp_path:
+            images[0].save(temp_path, format='GIF', save_all=True, append_images=images[1:],
+                           loop=0, duration=interval)
+    return len(images)
+
+
+# 流水线预设保存目录和内置预设
+PIPELINE_PRESET_DIR = os.path.join(BASE_DIR, "pipelines")
+BUILTIN_PIPELINES = {
+    "PDF表格拆分为多个Excel": [("pdf_tables", {}), ("write_sheets", {})],
+    "PDF表格合并为一个Excel": [("pdf_tables", {}), ("write_workbook", {})],
+    "Excel删除空行后拆分": [("excel_sheets", {}), ("drop_empty_rows", {}), ("write_sheets", {})],
+    "GIF缩小一半": [("gif_frames", {}), ("resize_frames", {"scale": 0.5}), ("write_gif", {})],
+    "图片合并为GIF": [("images", {}), ("write_gif", {"interval": 100})],
+}
+
+
+class PipelineCancelled(Exception):
+    """流水线被取消或有阶段出错"""
+
+
+class Pipeline:
+    """把多个工具阶段连接起来，阶段之间通过有界队列在内存中传递数据，不写中间文件
+    各阶段在各自的线程中并发执行，队列满时上游阶段等待(背压)
+    Chain tool stages through bounded in-memory queues
+    """
+    END = object()
+
+    def __init__(self, stages, queue_size=8):
+        """stages为[(阶段名称, 参数字典)]"""
+        self.stages = [(name, dict(options or {})) for name, options in stages]
+        self.queue_size = queue_size
+        self.validate()
+
+    def validate(self):
+        """检查阶段顺序和数据类型是否匹配"""
+        if len(self.stages) < 2:
+            raise ValueError("流水线至少需要一个数据源和一个输出阶段")
+        specs = []
+        for name, _ in self.stages:
+            if name not in PIPELINE_STAGES:
+                raise ValueError(f"未知的流水线阶段: {name}")
+            specs.append(PIPELINE_STAGES[name])
+        if specs[0]['role'] != 'source':
+            raise ValueError(f"第一个阶段必须是数据源: {specs[0]['name']}")
+        if specs[-1]['role'] != 'sink':
+            raise ValueError(f"最后一个阶段必须是输出: {specs[-1]['name']}")
+        for previous, current in zip(specs, specs[1:]):
+            if current['role'] == 'source' or previous['role'] == 'sink':
+                raise ValueError("数据源只能在开头，输出只能在结尾")
+            if previous['produces'] != current['accepts']:
+                raise ValueError(f"阶段 {previous['name']} 的输出不能作为 {current['name']} 的输入")
+
+    def to_dict(self):
+        return {'stages': [{'stage': name, 'options': options} for name, options in self.stages]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls([(stage['stage'], stage.get('options')) for stage in data['stages']])
+
+    def save(self, path):
+        """保存为预设"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """读取预设"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def put(self, q, item, cancel):
+        """放入队列，队列满时等待，被取消时抛出异常"""
+        while True:
+            if cancel.is_set():
+                raise PipelineCancelled()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def drain(self, q, cancel):
+        """把队列转换为迭代器，直到收到结束标记"""
+        while True:
+            if cancel.is_set():
+                raise PipelineCancelled()
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is self.END:
+                return
+            yield item
+
+    def run(self, source, output, log=None, cancel=None):
+        """运行流水线，返回输出阶段处理的条目数
+        source为数据源的输入(文件路径或路径列表)，output为输出文件或目录
+        """
+        cancel = cancel or threading.Event()
+        errors = []
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages[:-1]]
+
+        def feed(items, out_queue, stage_name):
+            try:
+                for item in items:
+                    self.put(out_queue, item, cancel)
+                    if log:
+                        log(f"[{stage_name}] {item[0]}", logging.DEBUG)
+                self.put(out_queue, self.END, cancel)
+            except PipelineCancelled:
+                pass
+            except Exception as e:
+                errors.append(e)
+                cancel.set()
+
+        # 数据源和中间阶段各用一个线程
+        sink_name, sink_options = self.stages[-1]
+        # 逐个写文件的输出阶段记录进度，中断后重新运行时跳过已写出的文件
+        checkpoint = None
+        if PIPELINE_STAGES[sink_name]['resumable']:
+            checkpoint = ConversionCheckpoint(output, "pipeline", source, self.to_dict())
+            sink_options = dict(sink_options, checkpoint=checkpoint)
+            if checkpoint.resumed and log:
+                log(f"继续上次中断的流水线，已完成 {checkpoint.resumed} 项")
+
+        threads = []
+        for i, (name, options) in enumerate(self.stages[:-1]):
+            func = PIPELINE_STAGES[name]['func']
+            if i == 0:
+                # 支持进度的数据源可以跳过已完成的部分，例如PDF中已写出的页
+                if PIPELINE_STAGES[name]['resumable']:
+                    options = dict(options, checkpoint=checkpoint)
+                items = func(source, **options)
+            else:
+                items = func(self.drain(queues[i - 1], cancel), **options)
+            thread = threading.Thread(target=feed, args=(items, queues[i], name), daemon=True)
+            threads.append(thread)
+
+        result = None
+        with metrics.timer("pipeline", input_size(source)):
+            for thread in threads:
+                thread.start()
+            try:
+                result = PIPELINE_STAGES[sink_name]['func'](
+                    self.drain(queues[-1], cancel), output, **sink_options)
+            except PipelineCancelled:
+                result = None
+            except Exception as e:
+                errors.append(e)
+                result = None
+            finally:
+                # 输出阶段出错时通知上游阶段停止
+                if errors:
+                    cancel.set()
+                for thread in threads:
+                    thread.join()
+                if checkpoint:
+                    if errors or result is None or checkpoint.failed:
+                        checkpoint.save()
+                    else:
+                        checkpoint.finish()
+
+        if errors:
+            raise errors[0]
+        if result is None:
+            raise PipelineCancelled("流水线已取消")
+        return result
+
+
+# 搜索时会检查内容的文本文件类型
+SEARCH_TEXT_EXTENSIONS = ('.txt', '.py', '.md', '.html', '.js', '.css')
+
+# 超过该大小的文件分块读写，编辑器切换到大文件模式
+CODE_LARGE_FILE_BYTES = 1024 * 1024
+# 超过该大小的文件不做语法高亮
+CODE_HIGHLIGHT_LIMIT_BYTES = 20 * 1024 * 1024
+# 分块读写时每块的字节数
+CODE_CHUNK_BYTES = 256 * 1024
+
+
+def search_files(query, search_dir):
+    """在目录中搜索文件名或内容包含关键字的文件，逐条生成匹配结果
+    Yield file name and content matches under a directory
+    """
+    query = query.lower()
+    for root, dirs, files in os.walk(search_dir):
+        for file in files:
+            file_path = os.path.join(root, file)
+
+            # 检查文件名匹配
+            if query in file.lower():
+                yield f"文件名匹配: {file_path}"
+
+            # 检查文件内容匹配
+            if file.endswith(SEARCH_TEXT_EXTENSIONS):
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            if query in line.lower():
+                                yield f"内容匹配: {file_path}"
+                                break
+                except (UnicodeDecodeError, PermissionError):
+                    continue
 
 
 class MainWindow(QMainWindow):
@@ -32,6 +1754,14 @@ class MainWindow(QMainWindow):
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.setSpacing(0)
 
+        # 插件、插件按钮和独立进程宿主
+        self.plugins = {}
+        self.plugin_buttons = {}
+        self.plugin_hosts = {}
+        self.plugin_watchdog = QTimer(self)
+        self.plugin_watchdog.setInterval(int(PLUGIN_HOST_HEARTBEAT * 1000))
+        self.plugin_watchdog.timeout.connect(self.check_plugin_hosts)
+
         # 创建侧边栏
         self.create_sidebar()
 
@@ -39,10 +1769,16 @@ class MainWindow(QMainWindow):
         self.create_content_area()
 
         # 初始化各个功能页面
-        self.create_home_page()
-        self.create_tools_page()
-        self.create_code_editor_page()
-        self.create_app_store_page()
+        for name, create_page in [("home", self.create_home_page),
+                                  ("tools", self.create_tools_page),
+                                  ("code_editor", self.create_code_editor_page),
+                                  ("app_store", self.create_app_store_page),
+                                  ("diagnostics", self.create_diagnostics_page)]:
+            with metrics.timer(f"page.{name}"):
+                create_page()
+
+        # 加载已安装的插件
+        self.load_installed_plugins()
 
         # 默认显示主页
         self.stacked_widget.setCurrentIndex(0)
@@ -75,94 +1811,175 @@ class MainWindow(QMainWindow):
         self.btn_tools = self.create_sidebar_button("实用工具", "tools.png")
         self.btn_code_editor = self.create_sidebar_button("代码编辑器", "code.png")
         self.btn_app_store = self.create_sidebar_button("插件商店", "store.png")
+        self.btn_diagnostics = self.create_sidebar_button("性能诊断")
 
         # 连接按钮信号
         self.btn_home.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
         self.btn_tools.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))
         self.btn_code_editor.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
         self.btn_app_store.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(3))
+        self.btn_diagnostics.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(4))
 
         # 添加按钮到侧边栏
         self.sidebar_layout.addWidget(self.btn_home)
         self.sidebar_layout.addWidget(self.btn_tools)
         self.sidebar_layout.addWidget(self.btn_code_editor)
         self.sidebar_layout.addWidget(self.btn_app_store)
-        self.sidebar_layout.addStretch()
+        self.sidebar_layout.addWidget(self.btn_diagnostics)
+
+        # 插件按钮放在可滚动区域中，安装很多插件时侧边栏不会被挤满
+        self.plugin_button_widget = QWidget()
+        self.plugin_button_layout = QVBoxLayout(self.plugin_button_widget)
+        self.plugin_button_layout.setContentsMargins(0, 0, 0, 0)
+        self.plugin_button_layout.setSpacing(20)
+        self.plugin_button_layout.addStretch()
+        plugin_scroll = QScrollArea()
+        plugin_scroll.setWidgetResizable(True)
+        plugin_scroll.setFrameShape(QScrollArea.NoFrame)
+        plugin_scroll.setWidget(self.plugin_button_widget)
+        self.sidebar_layout.addWidget(plugin_scroll, 1)
 
         # 将侧边栏添加到主布局
         self.main_layout.addWidget(self.sidebar)
         
-    def load_plugin(self, plugin_path):
+    def load_plugin(self, plugin_path, prewarm=True):
         """加载插件并创建侧边栏按钮
+        只读取元数据创建按钮，插件代码在第一次点击时才编译执行
         Load plugin and create sidebar button
         
         参数:
             plugin_path: .ltc插件文件路径
+            prewarm: 是否在后台按import字段预加载依赖并编译代码
         """
         try:
-            # 检查文件扩展名
-            if not plugin_path.endswith('.ltc'):
-                print(f"不支持的插件格式: {plugin_path}")
-                return
-                
-            # 使用utf-8编码读取插件文件
-            with open(plugin_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # 解析metadata部分
-            metadata = {}
-            code = ""
-            in_metadata = False
-            in_code = False
-            
-            for line in content.splitlines():
-                if line.strip() == '[metadata]':
-                    in_metadata = True
-                    in_code = False
-                elif line.strip() == '[code]':
-                    in_metadata = False
-                    in_code = True
-                elif in_metadata and '=' in line:
-                    key, value = line.split('=', 1)
-                    metadata[key.strip()] = value.strip()
-                elif in_code:
-                    code += line + '\n'
-            
-            # 验证必填字段
-            required_fields = ['name', 'version', 'description', 'category']
-            for field in required_fields:
-                if field not in metadata:
-                    print(f"插件缺少必填字段: {field}")
-                    return
-            
-            # 创建插件按钮
-            if 'name' in metadata:
-                # 检查是否已存在同名按钮
-                for i in range(self.sidebar_layout.count()):
-                    widget = self.sidebar_layout.itemAt(i).widget()
-                    if isinstance(widget, QPushButton) and widget.text() == metadata['name']:
-                        return
-                        
-                # 动态执行插件代码
-                plugin_globals = {}
-                exec(code, plugin_globals)
-                
-                # 获取main函数
-                if 'main' in plugin_globals:
-                    main_func = plugin_globals['main']
-                    
-                    # 创建按钮并绑定main函数
-                    btn = self.create_sidebar_button(
-                        metadata['name'], 
-                        None, 
-                        lambda: main_func()
-                    )
-                    self.sidebar_layout.insertWidget(self.sidebar_layout.count()-1, btn)
-                else:
-                    print("插件缺少main函数入口")
-                    
+            plugin = read_plugin(plugin_path)
         except Exception as e:
             print(f"加载插件失败: {str(e)}")
+            return None
+        return plugin if self.register_plugins([plugin], prewarm) else None
+
+    def register_plugins(self, plugins, prewarm=True):
+        """为插件创建侧边栏按钮，所有按钮在一次布局更新中加入
+        已存在同名插件时跳过，返回实际注册的插件列表
+        Register sidebar buttons for plugins in a single layout update
+        """
+        new_plugins = []
+        for plugin in plugins:
+            # 按名称查找重复插件
+            if plugin.name in self.plugins:
+                continue
+            self.plugins[plugin.name] = plugin
+            new_plugins.append(plugin)
+        if not new_plugins:
+            return []
+
+        self.plugin_button_widget.setUpdatesEnabled(False)
+        try:
+            for plugin in new_plugins:
+                # 创建按钮，点击时才激活插件
+                btn = self.create_sidebar_button(
+                    plugin.name, 
+                    None, 
+                    lambda checked=False, plugin=plugin: self.run_plugin(plugin)
+                )
+                self.plugin_button_layout.insertWidget(self.plugin_button_layout.count()-1, btn)
+                self.plugin_buttons[plugin.name] = btn
+        finally:
+            self.plugin_button_widget.setUpdatesEnabled(True)
+
+        # 独立进程运行的插件不需要在主进程中预热
+        if prewarm:
+            warm = [plugin for plugin in new_plugins if plugin.metadata.get('host') != 'process']
+            if warm:
+                self.prewarm_plugins(warm)
+        return new_plugins
+
+    def load_installed_plugins(self):
+        """在后台并行扫描已安装插件目录，完成后一次性创建按钮
+        Scan the installed-plugins directory in the background
+        """
+        self.plugin_scan_thread = PluginScanWorker(PLUGIN_INSTALL_DIR)
+        self.plugin_scan_thread.loaded.connect(self.on_installed_plugins_loaded)
+        self.plugin_scan_thread.start()
+
+    def on_installed_plugins_loaded(self, plugins, errors):
+        """已安装插件扫描完成"""
+        for error in errors:
+            self.terminal_output.append(error, logging.WARNING)
+        registered = self.register_plugins(sorted(plugins.values(), key=lambda plugin: plugin.name))
+        if registered:
+            self.terminal_output.append(f"已加载 {len(registered)} 个已安装插件")
+
+    def run_plugin(self, plugin):
+        """运行插件，第一次运行时执行插件代码
+        Run plugin, executing its code on first use
+        """
+        try:
+            if plugin.metadata.get('host') == 'process':
+                self.run_plugin_in_host(plugin)
+            else:
+                with metrics.timer("plugin.run"):
+                    plugin.run()
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"插件 {plugin.name} 运行失败: {str(e)}")
+
+    def run_plugin_in_host(self, plugin):
+        """在独立进程中运行插件，已在运行时不重复启动
+        Run plugin in an isolated host process
+        """
+        host = self.plugin_hosts.get(plugin.name)
+        if host is None:
+            host = self.plugin_hosts[plugin.name] = PluginHost(plugin)
+        if host.is_alive():
+            return
+        host.restarts = 0
+        host.start()
+        self.terminal_output.append(f"插件 {plugin.name} 已在独立进程中启动 (PID {host.process.pid})")
+        if not self.plugin_watchdog.isActive():
+            self.plugin_watchdog.start()
+
+    def check_plugin_hosts(self):
+        """看门狗：收集宿主进程的资源占用，重启卡死的宿主
+        Watchdog for plugin host processes
+        """
+        for name, host in self.plugin_hosts.items():
+            host.poll()
+            if host.error:
+                self.terminal_output.append(f"插件 {name} 运行失败: {host.error}", logging.ERROR)
+                host.error = None
+            if host.is_hung():
+                if host.restarts < PLUGIN_HOST_MAX_RESTARTS:
+                    self.terminal_output.append(f"插件 {name} 无响应，正在重启宿主进程", logging.WARNING)
+                    host.restart()
+                else:
+                    self.terminal_output.append(f"插件 {name} 多次无响应，已停止", logging.ERROR)
+                    host.stop(timeout=0)
+
+            button = self.plugin_buttons.get(name)
+            if button is not None:
+                status = "运行中" if host.is_alive() else "未运行"
+                button.setToolTip(f"独立进程 {status}\nCPU: {host.cpu_time:.1f}s\n"
+                                  f"内存: {host.memory / 1024 / 1024:.1f}MB\n重启次数: {host.restarts}")
+
+        if not any(host.is_alive() for host in self.plugin_hosts.values()):
+            self.plugin_watchdog.stop()
+
+    def closeEvent(self, event):
+        """关闭窗口时结束所有插件宿主进程"""
+        for host in self.plugin_hosts.values():
+            host.stop(timeout=1)
+        super().closeEvent(event)
+
+    def prewarm_plugins(self, plugins):
+        """在后台线程预加载插件依赖并编译代码
+        Pre-warm plugins in a background thread
+        """
+        worker = PluginPrewarmWorker(plugins)
+        if not hasattr(self, 'prewarm_threads'):
+            self.prewarm_threads = []
+        self.prewarm_threads.append(worker)
+        worker.finished.connect(lambda: self.prewarm_threads.remove(worker))
+        worker.start()
 
     def create_sidebar_button(self, text, icon_path=None, callback=None):
         """创建侧边栏按钮
@@ -206,10 +2023,8 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.content_layout.addWidget(self.stacked_widget)
 
-        # 添加终端输出区域
-        self.terminal_output = QTextEdit()
-        self.terminal_output.setStyleSheet("background-color: #f5f5f5; border-radius: 10px; height: 200px;")
-        self.terminal_output.setReadOnly(True)
+        # 添加终端输出区域，日志保存在固定大小的环形缓冲区中，定时批量刷新
+        self.terminal_output = LogConsole(log_file=os.path.join(BASE_DIR, "logs", "LittleToolkit.log"))
 
         # 将内容区域添加到主布局
         self.main_layout.addWidget(self.content_widget, 1)
@@ -266,6 +2081,9 @@ class MainWindow(QMainWindow):
         
         # 添加终端输出区域到实用工具页面
         layout.addWidget(self.terminal_output)
+
+        # 图片和GIF工具共用的缩略图加载器
+        self.thumbnail_cache = ThumbnailCache(os.path.join(BASE_DIR, PLUGIN_CACHE_DIR, "thumbnails"))
         
         # PPT转PDF工具
         ppt_group = QWidget()
@@ -389,6 +2207,17 @@ class MainWindow(QMainWindow):
         self.excel_output_label = QLabel("未选择输出目录")
         excel_layout.addWidget(self.excel_output_label)
 
+        excel_mode_layout = QHBoxLayout()
+        self.excel_mode_combo = QComboBox()
+        self.excel_mode_combo.addItem("按工作表拆分", "sheets")
+        self.excel_mode_combo.addItem("按行数拆分", "rows")
+        self.excel_mode_combo.addItem("按列的值拆分", "column")
+        self.excel_mode_input = QLineEdit()
+        self.excel_mode_input.setPlaceholderText("每个文件的行数 / 列名")
+        excel_mode_layout.addWidget(self.excel_mode_combo)
+        excel_mode_layout.addWidget(self.excel_mode_input)
+        excel_layout.addLayout(excel_mode_layout)
+
         excel_btn_layout = QHBoxLayout()
         select_excel_btn = QPushButton("选择Excel")
         select_excel_btn.clicked.connect(self.select_excel_file)
@@ -434,6 +2263,9 @@ class MainWindow(QMainWindow):
         gif_btn_layout.addWidget(split_gif_btn)
         gif_layout.addLayout(gif_btn_layout)
 
+        self.gif_thumbnail_model = ThumbnailModel(ThumbnailLoader(self.thumbnail_cache))
+        gif_layout.addWidget(self.create_thumbnail_strip(self.gif_thumbnail_model))
+
         layout.addWidget(gif_group)
 
         # GIF合并工具
@@ -464,8 +2296,90 @@ class MainWindow(QMainWindow):
         gif_merge_btn_layout.addWidget(merge_gif_btn)
         gif_merge_layout.addLayout(gif_merge_btn_layout)
 
+        self.merge_thumbnail_model = ThumbnailModel(ThumbnailLoader(self.thumbnail_cache))
+        gif_merge_layout.addWidget(self.create_thumbnail_strip(self.merge_thumbnail_model))
+
         layout.addWidget(gif_merge_group)
+
+        # 工具流水线
+        pipeline_group = QWidget()
+        pipeline_layout = QVBoxLayout(pipeline_group)
+
+        pipeline_title = QLabel("工具流水线")
+        pipeline_title.setFont(QFont("Arial", 20, QFont.Bold))
+        pipeline_layout.addWidget(pipeline_title)
+
+        pipeline_instructions = QLabel("1. 选择预设或组合各个阶段\n2. 选择输入文件\n3. 点击运行并选择输出位置\n"
+                                       "各阶段在内存中传递数据，不生成中间文件")
+        pipeline_layout.addWidget(pipeline_instructions)
+
+        self.pipeline_preset_combo = QComboBox()
+        self.pipeline_preset_combo.activated.connect(self.load_pipeline_preset)
+        pipeline_layout.addWidget(self.pipeline_preset_combo)
+
+        stage_layout = QHBoxLayout()
+        self.pipeline_stage_combos = {}
+        for role, placeholder in [("source", None), ("transform", "（不处理）"), ("sink", None)]:
+            combo = QComboBox()
+            if placeholder:
+                combo.addItem(placeholder, None)
+            for name, spec in PIPELINE_STAGES.items():
+                if spec['role'] == role:
+                    combo.addItem(spec['label'], name)
+            self.pipeline_stage_combos[role] = combo
+            stage_layout.addWidget(combo)
+        pipeline_layout.addLayout(stage_layout)
+
+        self.pipeline_input_label = QLabel("未选择文件")
+        pipeline_layout.addWidget(self.pipeline_input_label)
+
+        pipeline_btn_layout = QHBoxLayout()
+        select_pipeline_input_btn = QPushButton("选择输入")
+        select_pipeline_input_btn.clicked.connect(self.select_pipeline_input)
+        self.run_pipeline_btn = QPushButton("运行")
+        self.run_pipeline_btn.clicked.connect(self.run_pipeline)
+        cancel_pipeline_btn = QPushButton("取消")
+        cancel_pipeline_btn.clicked.connect(self.cancel_pipeline)
+        save_pipeline_btn = QPushButton("保存预设")
+        save_pipeline_btn.clicked.connect(self.save_pipeline_preset)
+
+        pipeline_btn_layout.addWidget(select_pipeline_input_btn)
+        pipeline_btn_layout.addWidget(self.run_pipeline_btn)
+        pipeline_btn_layout.addWidget(cancel_pipeline_btn)
+        pipeline_btn_layout.addWidget(save_pipeline_btn)
+        pipeline_layout.addLayout(pipeline_btn_layout)
+
+        layout.addWidget(pipeline_group)
+        self.refresh_pipeline_presets()
+
+        # 转换结果缓存
+        cache_group = QWidget()
+        cache_layout = QVBoxLayout(cache_group)
+
+        cache_title = QLabel("转换结果缓存")
+        cache_title.setFont(QFont("Arial", 20, QFont.Bold))
+        cache_layout.addWidget(cache_title)
+
+        self.cache_stats_label = QLabel()
+        cache_layout.addWidget(self.cache_stats_label)
+
+        cache_btn_layout = QHBoxLayout()
+        self.cache_enabled_checkbox = QCheckBox("使用缓存")
+        self.cache_enabled_checkbox.setChecked(result_cache.enabled)
+        self.cache_enabled_checkbox.toggled.connect(self.set_result_cache_enabled)
+        refresh_cache_btn = QPushButton("刷新统计")
+        refresh_cache_btn.clicked.connect(self.refresh_cache_stats)
+        clear_cache_btn = QPushButton("清空缓存")
+        clear_cache_btn.clicked.connect(self.clear_result_cache)
+
+        cache_btn_layout.addWidget(self.cache_enabled_checkbox)
+        cache_btn_layout.addWidget(refresh_cache_btn)
+        cache_btn_layout.addWidget(clear_cache_btn)
+        cache_layout.addLayout(cache_btn_layout)
+
+        layout.addWidget(cache_group)
         layout.addStretch()
+        self.refresh_cache_stats()
 
         self.stacked_widget.addWidget(self.tools_page)
 
@@ -474,31 +2388,56 @@ class MainWindow(QMainWindow):
         self.code_editor_page = QWidget()
         layout = QVBoxLayout(self.code_editor_page)
 
-        # 代码编辑区域
-        self.code_editor = QTextEdit()
+        # 持久化执行会话，变量在多次运行之间保留
+        self.repl_session = ReplSession()
+
+        # 代码编辑区域，纯文本文档按块布局，高亮只处理修改过的块
+        self.code_editor = QPlainTextEdit()
         self.code_editor.setFont(QFont("Consolas", 14))
         self.code_editor.setStyleSheet("background-color: white; border-radius: 10px;")
+        self.code_editor.setPlaceholderText("选中代码或用 # %% 划分单元，点击运行只执行当前部分")
+        self.code_highlighter = PythonHighlighter(self.code_editor.document())
+        self.code_loader = None
         layout.addWidget(self.code_editor)
 
         # 按钮区域
         btn_layout = QHBoxLayout()
         run_btn = QPushButton("运行")
+        run_btn.setToolTip("运行选中代码或光标所在单元")
         run_btn.clicked.connect(self.run_code)
+        run_all_btn = QPushButton("运行全部")
+        run_all_btn.clicked.connect(self.run_all_code)
+        restart_btn = QPushButton("重启会话")
+        restart_btn.clicked.connect(self.restart_session)
+        open_btn = QPushButton("打开")
+        open_btn.clicked.connect(self.open_code)
         save_btn = QPushButton("保存")
         save_btn.clicked.connect(self.save_code)
         clear_btn = QPushButton("清空")
         clear_btn.clicked.connect(self.clear_code)
 
         btn_layout.addWidget(run_btn)
+        btn_layout.addWidget(run_all_btn)
+        btn_layout.addWidget(restart_btn)
+        btn_layout.addWidget(open_btn)
         btn_layout.addWidget(save_btn)
         btn_layout.addWidget(clear_btn)
         layout.addLayout(btn_layout)
 
-        # 输出区域
+        # 输出区域和变量查看区域
+        output_layout = QHBoxLayout()
         self.code_output = QTextEdit()
         self.code_output.setReadOnly(True)
         self.code_output.setStyleSheet("background-color: #f5f5f5; border-radius: 10px;")
-        layout.addWidget(self.code_output)
+        output_layout.addWidget(self.code_output, 1)
+
+        self.variable_list = QListWidget()
+        self.variable_list.setFixedWidth(300)
+        self.variable_list.setStyleSheet("background-color: #f5f5f5; border-radius: 10px;")
+        self.variable_list.setToolTip("双击查看变量详情")
+        self.variable_list.itemDoubleClicked.connect(self.inspect_variable)
+        output_layout.addWidget(self.variable_list)
+        layout.addLayout(output_layout)
 
         self.stacked_widget.addWidget(self.code_editor_page)
 
@@ -508,47 +2447,27 @@ class MainWindow(QMainWindow):
         """
         self.app_store_page = QWidget()
         
-        layout = QVBoxLayout(self.app_store_page)
-        
-        # 计算器插件安装按钮
-        calculator_btn = QPushButton("安装计算器插件")
-        calculator_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2ecc71;
-                color: white;
-                border: none;
-                padding: 15px;
-                font-size: 18px;
-                border-radius: 10px;
-            }
-            QPushButton:hover {
-                background-color: #27ae60;
-            }
-        """)
-        calculator_btn.clicked.connect(lambda: self.load_plugin("numberbot.ltc"))
-        
-        layout.addWidget(calculator_btn)
-        layout.addStretch()
         layout = QHBoxLayout(self.app_store_page)
 
-        # 插件列表
-        self.app_list = QListWidget()
+        # 插件列表，使用模型/视图，不为每个插件创建控件
+        list_layout = QVBoxLayout()
+        self.app_filter_input = QLineEdit()
+        self.app_filter_input.setPlaceholderText("搜索插件名称、描述或类别...")
+        self.app_filter_input.setStyleSheet("padding: 8px; border-radius: 10px;")
+        self.app_filter_input.textChanged.connect(self.filter_app_catalog)
+        list_layout.addWidget(self.app_filter_input)
+
+        self.app_catalog_model = PluginCatalogModel()
+        self.app_list = QListView()
+        self.app_list.setModel(self.app_catalog_model)
+        self.app_list.setUniformItemSizes(True)
         self.app_list.setFixedWidth(350)
-        self.app_list.itemClicked.connect(self.show_app_details)
+        self.app_list.clicked.connect(self.show_app_details)
         self.app_list.setStyleSheet("border-radius: 10px;")
+        list_layout.addWidget(self.app_list)
 
-        # 模拟插件数据
-        apps = [
-            {"name": "文本编辑器", "description": "一个简单的文本编辑工具", "category": "工具", "file": "text_editor.ltc"},
-            {"name": "计算器", "description": "科学计算器", "category": "工具", "file": "calculator.ltc"},
-            {"name": "天气插件", "description": "查看实时天气信息", "category": "实用程序", "file": "weather.ltc"},
-            {"name": "神秘彩蛋", "description": "点击这里看看惊喜！", "category": "秘密", "file": "easter_egg.ltc"}
-        ]
-
-        for app in apps:
-            item = QListWidgetItem(app["name"])
-            item.setData(Qt.UserRole, app)
-            self.app_list.addItem(item)
+        self.app_catalog_status = QLabel("正在加载插件目录...")
+        list_layout.addWidget(self.app_catalog_status)
 
         # 应用详情
         self.app_details = QWidget()
@@ -565,16 +2484,153 @@ class MainWindow(QMainWindow):
         self.app_category = QLabel()
         details_layout.addWidget(self.app_category)
 
+        self.app_version = QLabel()
+        details_layout.addWidget(self.app_version)
+
         install_btn = QPushButton("安装插件")
+        install_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #2ecc71;
+                color: white;
+                border: none;
+                padding: 15px;
+                font-size: 18px;
+                border-radius: 10px;
+            }
+            QPushButton:hover {
+                background-color: #27ae60;
+            }
+        """)
         install_btn.clicked.connect(self.install_plugin)
         details_layout.addWidget(install_btn)
         details_layout.addStretch()
 
-        layout.addWidget(self.app_list)
+        layout.addLayout(list_layout)
         layout.addWidget(self.app_details)
 
         self.stacked_widget.addWidget(self.app_store_page)
 
+        # 后台扫描插件目录
+        self.load_app_catalog()
+
+    def load_app_catalog(self):
+        """在后台线程扫描插件目录
+        Scan the plugin catalog in a background thread
+        """
+        self.catalog_thread = CatalogScanWorker(PLUGIN_STORE_DIRS)
+        self.catalog_thread.loaded.connect(self.on_app_catalog_loaded)
+        self.catalog_thread.start()
+
+    def on_app_catalog_loaded(self, entries):
+        """插件目录加载完成"""
+        # 彩蛋条目没有对应的插件文件
+        entries.append({"name": "神秘彩蛋", "description": "点击这里看看惊喜！", "category": "秘密",
+                        "version": "", "author": "", "file": ""})
+        self.app_catalog_model.set_entries(entries)
+        self.filter_app_catalog(self.app_filter_input.text())
+
+    def filter_app_catalog(self, text):
+        """按关键字过滤插件列表"""
+        self.app_catalog_model.set_filter(text)
+        self.app_catalog_status.setText(
+            f"共 {self.app_catalog_model.match_count()} 个插件")
+
+    def create_diagnostics_page(self):
+        """创建性能诊断页面
+        Create diagnostics page
+        """
+        self.diagnostics_page = QWidget()
+        layout = QVBoxLayout(self.diagnostics_page)
+
+        title = QLabel("性能诊断")
+        title.setFont(QFont("Arial", 20, QFont.Bold))
+        layout.addWidget(title)
+
+        self.diagnostics_summary = QLabel()
+        layout.addWidget(self.diagnostics_summary)
+
+        self.metrics_table = QTableWidget(0, 7)
+        self.metrics_table.setHorizontalHeaderLabels(
+            ["操作", "次数", "p50 (ms)", "p95 (ms)", "最长 (ms)", "错误", "处理数据 (MB)"])
+        self.metrics_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.metrics_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.metrics_table.setStyleSheet("background-color: white; border-radius: 10px;")
+        layout.addWidget(self.metrics_table)
+
+        btn_layout = QHBoxLayout()
+        self.metrics_enabled_checkbox = QCheckBox("启用性能统计")
+        self.metrics_enabled_checkbox.setChecked(metrics.enabled)
+        self.metrics_enabled_checkbox.toggled.connect(self.set_metrics_enabled)
+        refresh_btn = QPushButton("刷新")
+        refresh_btn.clicked.connect(self.refresh_metrics)
+        reset_btn = QPushButton("清零")
+        reset_btn.clicked.connect(self.reset_metrics)
+        export_btn = QPushButton("导出JSON")
+        export_btn.clicked.connect(self.export_metrics)
+
+        btn_layout.addWidget(self.metrics_enabled_checkbox)
+        btn_layout.addWidget(refresh_btn)
+        btn_layout.addWidget(reset_btn)
+        btn_layout.addWidget(export_btn)
+        layout.addLayout(btn_layout)
+
+        # 队列长度在生成快照时才读取
+        metrics.register_gauge("log_queue", lambda: len(self.terminal_output.pending))
+        metrics.register_gauge("plugin_prewarm_threads", lambda: len(getattr(self, 'prewarm_threads', [])))
+        metrics.register_gauge("plugin_hosts_alive",
+                               lambda: sum(host.is_alive() for host in self.plugin_hosts.values()))
+
+        # 只在诊断页面显示时定时刷新
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.refresh_metrics)
+        self.stacked_widget.currentChanged.connect(self.on_page_changed)
+
+        self.stacked_widget.addWidget(self.diagnostics_page)
+
+    def on_page_changed(self, index):
+        """切换页面时启停诊断页面的定时刷新"""
+        if self.stacked_widget.widget(index) is self.diagnostics_page:
+            self.refresh_metrics()
+            self.metrics_timer.start(1000)
+        else:
+            self.metrics_timer.stop()
+
+    def refresh_metrics(self):
+        """刷新诊断页面的统计数据"""
+        snapshot = metrics.snapshot()
+        gauges = ", ".join(f"{name}: {value}" for name, value in snapshot['gauges'].items())
+        self.diagnostics_summary.setText(
+            f"内存: {snapshot['memory'] / 1024 / 1024:.1f}MB  CPU时间: {snapshot['cpu_time']:.1f}s\n"
+            f"队列: {gauges}")
+
+        operations = sorted(snapshot['operations'].items())
+        self.metrics_table.setRowCount(len(operations))
+        for row, (name, stats) in enumerate(operations):
+            values = [name, str(stats['count']), f"{stats['p50'] * 1000:.1f}",
+                      f"{stats['p95'] * 1000:.1f}", f"{stats['max'] * 1000:.1f}",
+                      str(stats['errors']), f"{stats['bytes'] / 1024 / 1024:.2f}"]
+            for column, value in enumerate(values):
+                self.metrics_table.setItem(row, column, QTableWidgetItem(value))
+
+    def set_metrics_enabled(self, enabled):
+        """启用或关闭性能统计"""
+        metrics.enabled = enabled
+
+    def reset_metrics(self):
+        """清空性能统计"""
+        metrics.reset()
+        self.refresh_metrics()
+
+    def export_metrics(self):
+        """导出性能统计为JSON文件"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出性能统计", "metrics.json", "JSON文件 (*.json)")
+        if file_path:
+            try:
+                metrics.export_json(file_path)
+                QMessageBox.information(self, "成功", f"性能统计已导出到: {file_path}")
+            except Exception as e:
+                QMessageBox.critical(self, "错误", f"导出失败: {str(e)}")
+
     # 以下是各个功能的实现方法
     def perform_search(self):
         """执行搜索功能"""
@@ -655,15 +2711,13 @@ class MainWindow(QMainWindow):
 
         try:
             output_path = self.pdf_excel_path.replace('.pdf', '.xlsx')
-            with pdfplumber.open(self.pdf_excel_path) as pdf_file:
-                first_page = pdf_file.pages[0]
-                tables = first_page.extract_tables()
-                if tables:
-                    df = pd.DataFrame(tables[0])
-                    df.to_excel(output_path, index=False)
-                    QMessageBox.information(self, "成功", f"文件已转换为 {output_path}")
-                else:
-                    QMessageBox.warning(self, "警告", "未找到表格数据！")
+            rows, cached = cached_file_conversion("pdf_to_excel", pdf_to_excel, self.pdf_excel_path, output_path)
+            if rows:
+                if cached:
+                    self.terminal_output.append(f"使用缓存的转换结果: {output_path}")
+                QMessageBox.information(self, "成功", f"文件已转换为 {output_path}")
+            else:
+                QMessageBox.warning(self, "警告", "未找到表格数据！")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"转换失败: {str(e)}")
 
@@ -674,12 +2728,12 @@ class MainWindow(QMainWindow):
         """
         if not hasattr(self, 'pdf_path'):
             QMessageBox.warning(self, "警告", "请先选择PDF文件！")
-            self.terminal_output.append("错误: 未选择PDF文件\nError: No PDF file selected")
+            self.terminal_output.append("错误: 未选择PDF文件\nError: No PDF file selected", logging.ERROR)
             return
 
         if not os.path.exists(self.pdf_path):
             QMessageBox.warning(self, "警告", "PDF文件不存在！")
-            self.terminal_output.append(f"错误: 文件不存在 {self.pdf_path}\nError: File not found {self.pdf_path}")
+            self.terminal_output.append(f"错误: 文件不存在 {self.pdf_path}\nError: File not found {self.pdf_path}", logging.ERROR)
             return
 
         try:
@@ -693,7 +2747,7 @@ class MainWindow(QMainWindow):
                 os.remove(output_path)
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"输出路径不可写: {str(e)}")
-                self.terminal_output.append(f"错误: 输出路径不可写 {output_path}\nError: Output path not writable {output_path}")
+                self.terminal_output.append(f"错误: 输出路径不可写 {output_path}\nError: Output path not writable {output_path}", logging.ERROR)
                 return
 
             # 确保已安装pdf2docx库
@@ -701,20 +2755,20 @@ class MainWindow(QMainWindow):
                 from pdf2docx import Converter
             except ImportError:
                 QMessageBox.critical(self, "错误", "请先安装pdf2docx库: pip install pdf2docx -i https://mirrors.aliyun.com/pypi/simple/")
-                self.terminal_output.append("错误: 未安装pdf2docx库\nError: pdf2docx library not installed")
+                self.terminal_output.append("错误: 未安装pdf2docx库\nError: pdf2docx library not installed", logging.ERROR)
                 return
 
-            # 调用Converter进行转换
-            cv = Converter(self.pdf_path)
-            cv.convert(output_path, start=0, end=None)
-            cv.close()
+            # 调用Converter进行转换，相同内容的PDF直接使用缓存
+            _, cached = cached_file_conversion("pdf_to_word", pdf_to_word, self.pdf_path, output_path)
+            if cached:
+                self.terminal_output.append(f"使用缓存的转换结果: {output_path}")
             
             self.terminal_output.append(f"转换成功: {output_path}\nConversion successful: {output_path}")
             QMessageBox.information(self, "成功", f"文件已转换为 {output_path}")
             
         except Exception as e:
             error_msg = f"转换失败: {str(e)}\nConversion failed: {str(e)}"
-            self.terminal_output.append(error_msg)
+            self.terminal_output.append(error_msg, logging.ERROR)
             QMessageBox.critical(self, "错误", error_msg)
 
     def select_excel_file(self):
@@ -736,6 +2790,26 @@ class MainWindow(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(self, "选择GIF文件", "", "GIF文件 (*.gif)")
         if file_path:
             self.gif_path_label.setText(file_path)
+            try:
+                with Image.open(file_path) as gif:
+                    frame_count = getattr(gif, 'n_frames', 1)
+                self.gif_thumbnail_model.set_items([(file_path, i) for i in range(frame_count)])
+            except Exception as e:
+                self.terminal_output.append(f"读取GIF预览失败: {str(e)}", logging.WARNING)
+
+    def create_thumbnail_strip(self, model):
+        """创建横向的缩略图条，只有可见的条目才会加载缩略图"""
+        view = QListView()
+        view.setModel(model)
+        view.setViewMode(QListView.IconMode)
+        view.setFlow(QListView.LeftToRight)
+        view.setWrapping(False)
+        view.setUniformItemSizes(True)
+        view.setMovement(QListView.Static)
+        view.setIconSize(QSize(ThumbnailModel.SIZE, ThumbnailModel.SIZE))
+        view.setFixedHeight(ThumbnailModel.SIZE + 50)
+        view.setStyleSheet("background-color: white; border-radius: 10px;")
+        return view
 
     def select_gif_output_folder(self):
         """选择GIF输出目录
@@ -760,21 +2834,15 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            from PIL import Image
-            
-            # 打开GIF文件
-            gif = Image.open(gif_path)
-            
-            # 遍历每一帧并保存
-            for i in range(gif.n_frames):
-                gif.seek(i)
-                frame_path = os.path.join(output_path, f"frame_{i}.png")
-                gif.save(frame_path)
-                self.terminal_output.append(f"已保存第 {i} 帧到 {frame_path}")
-            
-            self.terminal_output.append(f"\n拆分完成，共保存了 {gif.n_frames} 帧")
+            frame_count, cached = cached_dir_conversion(
+                "split_gif", split_gif_file, gif_path, output_path,
+                lambda n: [os.path.join(output_path, f"frame_{i}.png") for i in range(n)],
+                log=self.terminal_output.append)
+            if cached:
+                self.terminal_output.append("使用缓存的拆分结果")
+            self.terminal_output.append(f"拆分完成，共保存了 {frame_count} 帧")
         except Exception as e:
-            self.terminal_output.append(f"\n拆分GIF失败: {str(e)}")
+            self.terminal_output.append(f"拆分GIF失败: {str(e)}", logging.ERROR)
 
     def split_excel_sheets(self):
         """拆分Excel工作表
@@ -790,117 +2858,204 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "请先选择输出目录")
             return
 
+        mode = self.excel_mode_combo.currentData()
+        value = self.excel_mode_input.text().strip()
+        if mode != "sheets" and not value:
+            QMessageBox.warning(self, "警告", "请输入每个文件的行数或列名")
+            return
+
         try:
-            # 根据文件扩展名选择不同的处理方式
-            if excel_path.lower().endswith('.xlsx'):
-                import openpyxl
-                # 读取.xlsx文件
-                wb = openpyxl.load_workbook(excel_path)
-                
-                # 遍历每个工作表并保存为单独文件
-                for sheet_name in wb.sheetnames:
-                    try:
-                        # 创建新工作簿并复制当前工作表
-                        new_wb = openpyxl.Workbook()
-                        new_sheet = new_wb.active
-                        
-                        # 复制数据
-                        for row in wb[sheet_name].iter_rows():
-                            new_row = []
-                            for cell in row:
-                                new_row.append(cell.value)
-                            new_sheet.append(new_row)
-                        
-                        # 保存文件
-                        output_file = os.path.join(output_path, f"{sheet_name}.xlsx")
-                        new_wb.save(output_file)
-                        self.terminal_output.append(f"已保存工作表 {sheet_name} 到 {output_file}")
-                    except Exception as e:
-                        self.terminal_output.append(f"保存工作表 {sheet_name} 失败: {str(e)}")
-            elif excel_path.lower().endswith('.xls'):
-                import xlrd
-                # 读取.xls文件
-                wb = xlrd.open_workbook(excel_path)
-                
-                # 遍历每个工作表并保存为单独文件
-                for sheet_name in wb.sheet_names():
-                    try:
-                        # 创建新工作簿
-                        import openpyxl
-                        new_wb = openpyxl.Workbook()
-                        new_sheet = new_wb.active
-                        
-                        # 读取数据
-                        sheet = wb.sheet_by_name(sheet_name)
-                        for row_idx in range(sheet.nrows):
-                            new_row = sheet.row_values(row_idx)
-                            new_sheet.append(new_row)
-                        
-                        # 保存文件
-                        output_file = os.path.join(output_path, f"{sheet_name}.xlsx")
-                        new_wb.save(output_file)
-                        self.terminal_output.append(f"已保存工作表 {sheet_name} 到 {output_file}")
-                    except Exception as e:
-                        self.terminal_output.append(f"保存工作表 {sheet_name} 失败: {str(e)}")
+            if mode == "sheets":
+                _, cached = cached_dir_conversion(
+                    "split_excel", split_excel_file, excel_path, output_path,
+                    lambda outputs: outputs, log=self.terminal_output.append)
             else:
-                raise ValueError("不支持的文件格式，请使用.xls或.xlsx文件")
-            
+                if mode == "rows":
+                    if not value.isdigit() or int(value) <= 0:
+                        QMessageBox.warning(self, "警告", "行数必须为正整数")
+                        return
+                    options = {"rows_per_file": int(value)}
+                else:
+                    options = {"column": value}
+                _, cached = cached_dir_conversion(
+                    "partition_excel", partition_excel_file, excel_path, output_path,
+                    lambda outputs: outputs, log=self.terminal_output.append, **options)
+            if cached:
+                self.terminal_output.append("使用缓存的拆分结果")
             QMessageBox.information(self, "成功", f"已拆分Excel文件到: {output_path}")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"拆分Excel文件失败: {str(e)}")
 
     def run_code(self):
-        """运行代码"""
-        code = self.code_editor.toPlainText()
-        if not code:
+        """运行选中代码或光标所在单元
+        Run the selected code or the cell under the cursor
+        """
+        cursor = self.code_editor.textCursor()
+        if cursor.hasSelection():
+            # 选中文本使用U+2029作为段落分隔符
+            code = cursor.selectedText().replace('\u2029', '\n')
+        else:
+            code = self.current_cell_code(cursor.blockNumber())
+        self.execute_in_session(textwrap.dedent(code))
+
+    def run_all_code(self):
+        """运行全部代码
+        Run the whole editor text
+        """
+        self.execute_in_session(self.code_editor.toPlainText())
+
+    def current_cell_code(self, line_number):
+        """获取光标所在单元的代码，单元以 # %% 开头的行划分
+        Get the code of the cell containing the given line
+        """
+        document = self.code_editor.document()
+        # 从光标所在行向上、向下查找单元分隔行，不复制整个文档
+        start = document.findBlockByNumber(line_number)
+        while start.isValid() and not start.text().lstrip().startswith('# %%'):
+            start = start.previous()
+        block = start.next() if start.isValid() else document.firstBlock()
+
+        lines = []
+        while block.isValid() and not block.text().lstrip().startswith('# %%'):
+            lines.append(block.text())
+            block = block.next()
+        return '\n'.join(lines)
+
+    def execute_in_session(self, code):
+        """在持久化会话中执行代码并显示结果
+        Execute code in the persistent session and show the result
+        """
+        if not code.strip():
             QMessageBox.warning(self, "警告", "请输入代码")
             return
 
-        # 重定向标准输出
-        old_stdout = sys.stdout
-        redirected_output = sys.stdout = io.StringIO()
+        output, ok = self.repl_session.run(code)
+        count = self.repl_session.execution_count
+        header = f"[{count}] 执行结果:" if ok else f"[{count}] 执行错误:"
+        self.code_output.append(header + "\n" + output.rstrip())
+        self.refresh_variables()
 
+    def restart_session(self):
+        """重启会话，清空所有变量
+        Restart the session and drop all variables
+        """
+        self.repl_session.restart()
+        self.code_output.append("会话已重启\nSession restarted")
+        self.refresh_variables()
+
+    def refresh_variables(self):
+        """刷新变量列表"""
+        self.variable_list.clear()
+        for name, type_name, summary in self.repl_session.variables():
+            item = QListWidgetItem(f"{name} ({type_name}): {summary}")
+            item.setData(Qt.UserRole, name)
+            self.variable_list.addItem(item)
+
+    def inspect_variable(self, item):
+        """显示变量详情"""
+        name = item.data(Qt.UserRole)
+        self.code_output.append(f"{name} =\n{self.repl_session.describe(name)}")
+
+    def open_code(self):
+        """打开代码文件，大文件分块读入，读入期间界面保持响应
+        Open a file, loading large ones in chunks between event-loop turns
+        """
+        file_path, _ = QFileDialog.getOpenFileName(self, "打开代码", "", "Python文件 (*.py);;所有文件 (*)")
+        if not file_path:
+            return
         try:
-            # 执行代码并捕获输出
-            with contextlib.redirect_stdout(redirected_output):
-                exec(code)
+            size = os.path.getsize(file_path)
+            code_file = open(file_path, 'r', encoding='utf-8', errors='replace', newline='')
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"打开失败: {str(e)}")
+            return
 
-            # 获取执行结果
-            output = redirected_output.getvalue()
-            self.code_output.setText("执行结果:\n" + output)
+        self.stop_code_loader()
+        self.set_large_file_mode(size > CODE_LARGE_FILE_BYTES,
+                                 highlight=size <= CODE_HIGHLIGHT_LIMIT_BYTES)
+        if size <= CODE_LARGE_FILE_BYTES:
+            with code_file:
+                self.code_editor.setPlainText(code_file.read())
+            return
 
-        except Exception as e:
-            self.code_output.setText(f"执行错误:\n{str(e)}")
-        finally:
-            sys.stdout = old_stdout
+        # 大文件分块追加，读入期间不记录撤销历史
+        self.code_editor.clear()
+        self.code_editor.setReadOnly(True)
+        self.code_editor.document().setUndoRedoEnabled(False)
+        self.code_loader = ChunkedTextLoader(code_file, self.code_editor, size)
+        self.code_loader.progress.connect(
+            lambda percent: self.code_output.setPlainText(f"正在读取 {file_path}: {percent}%"))
+        self.code_loader.finished.connect(lambda: self.on_code_loaded(file_path))
+        self.code_loader.start()
+
+    def on_code_loaded(self, file_path):
+        """大文件读取完成"""
+        self.code_loader = None
+        self.restore_code_editing()
+        self.code_editor.moveCursor(QTextCursor.Start)
+        self.code_output.setPlainText(
+            f"已打开 {file_path}（{self.code_editor.blockCount()} 行，大文件模式）")
+
+    def stop_code_loader(self):
+        """中止正在进行的大文件读取，并恢复编辑和撤销"""
+        if self.code_loader is None:
+            return
+        self.code_loader.stop()
+        self.code_loader = None
+        self.restore_code_editing()
+
+    def restore_code_editing(self):
+        self.code_editor.document().setUndoRedoEnabled(True)
+        self.code_editor.setReadOnly(False)
+
+    def set_large_file_mode(self, enabled, highlight=True):
+        """大文件模式下关闭自动换行，过大的文件不做语法高亮"""
+        self.code_editor.setLineWrapMode(
+            QPlainTextEdit.NoWrap if enabled else QPlainTextEdit.WidgetWidth)
+        self.code_highlighter.setDocument(self.code_editor.document() if highlight else None)
 
     def save_code(self):
-        """保存代码"""
-        code = self.code_editor.toPlainText()
-        if not code:
+        """保存代码，逐块分批写入，不拼接整个文档的字符串
+        Save the document block by block in chunks
+        """
+        document = self.code_editor.document()
+        if document.isEmpty():
             QMessageBox.warning(self, "警告", "没有代码可保存")
             return
 
         file_path, _ = QFileDialog.getSaveFileName(self, "保存代码", "", "Python文件 (*.py);;所有文件 (*)")
         if file_path:
             try:
-                with open(file_path, 'w') as f:
-                    f.write(code)
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    chunk, chunk_size = [], 0
+                    block = document.firstBlock()
+                    while block.isValid():
+                        line = block.text()
+                        block = block.next()
+                        chunk.append(line + '\n' if block.isValid() else line)
+                        chunk_size += len(line) + 1
+                        if chunk_size >= CODE_CHUNK_BYTES:
+                            f.write(''.join(chunk))
+                            chunk, chunk_size = [], 0
+                    f.write(''.join(chunk))
                 QMessageBox.information(self, "成功", f"代码已保存到: {file_path}")
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"保存失败: {str(e)}")
 
     def clear_code(self):
-        """清空代码"""
+        """清空代码，会话中的变量保留"""
+        self.stop_code_loader()
+        self.set_large_file_mode(False)
         self.code_editor.clear()
         self.code_output.clear()
 
-    def show_app_details(self, item):
+    def show_app_details(self, index):
         """显示应用详情"""
-        app_data = item.data(Qt.UserRole)
+        app_data = index.data(Qt.UserRole)
         self.app_title.setText(app_data["name"])
         self.app_description.setText(app_data["description"])
         self.app_category.setText(f"类别: {app_data['category']}")
+        self.app_version.setText(f"版本: {app_data['version']}  作者: {app_data['author']}")
 
         if app_data["name"] == "神秘彩蛋":
             self.play_video()
@@ -955,19 +3110,36 @@ class MainWindow(QMainWindow):
         QMessageBox.critical(self, "播放错误", f"无法播放视频: {error_msg}")
 
     def install_plugin(self):
-        """安装插件"""
-        current_item = self.app_list.currentItem()
-        if current_item:
-            plugin_data = current_item.data(Qt.UserRole)
-            try:
-                # 解析.ltc插件文件
-                with open(plugin_data['file'], 'r', encoding='utf-8') as f:
-                    plugin_content = f.read()
-                    # TODO: 添加实际插件安装逻辑
-                    QMessageBox.information(self, "安装成功", 
-                        f"已成功安装插件 {plugin_data['name']}\n文件: {plugin_data['file']}")
-            except Exception as e:
-                QMessageBox.critical(self, "安装失败", f"插件安装失败: {str(e)}")
+        """安装插件，加载到侧边栏"""
+        index = self.app_list.currentIndex()
+        if not index.isValid():
+            QMessageBox.warning(self, "警告", "请先选择插件")
+            return
+
+        plugin_data = index.data(Qt.UserRole)
+        if not plugin_data['file']:
+            QMessageBox.warning(self, "警告", "该条目不是可安装的插件")
+            return
+
+        if plugin_data['name'] in self.plugins:
+            QMessageBox.information(self, "提示", f"插件 {plugin_data['name']} 已安装")
+            return
+
+        try:
+            # 复制到已安装插件目录，下次启动时自动加载
+            os.makedirs(PLUGIN_INSTALL_DIR, exist_ok=True)
+            installed_path = os.path.join(PLUGIN_INSTALL_DIR, os.path.basename(plugin_data['file']))
+            if os.path.abspath(plugin_data['file']) != os.path.abspath(installed_path):
+                shutil.copyfile(plugin_data['file'], installed_path)
+        except OSError as e:
+            QMessageBox.critical(self, "安装失败", f"插件安装失败: {str(e)}")
+            return
+
+        if self.load_plugin(installed_path) is not None:
+            QMessageBox.information(self, "安装成功", 
+                f"已成功安装插件 {plugin_data['name']}\n文件: {installed_path}")
+        else:
+            QMessageBox.critical(self, "安装失败", f"插件安装失败: {plugin_data['file']}")
 
     def perform_search(self):
         """执行搜索功能"""
@@ -984,12 +3156,140 @@ class MainWindow(QMainWindow):
         self.search_thread.finished.connect(lambda: self.search_results.append("\n搜索完成！"))
         self.search_thread.start()
 
+    def refresh_pipeline_presets(self):
+        """刷新流水线预设列表，包括内置预设和保存的预设"""
+        self.pipeline_presets = {name: Pipeline(stages) for name, stages in BUILTIN_PIPELINES.items()}
+        try:
+            for file in sorted(os.listdir(PIPELINE_PRESET_DIR)):
+                if file.endswith('.json'):
+                    try:
+                        self.pipeline_presets[file[:-5]] = Pipeline.load(os.path.join(PIPELINE_PRESET_DIR, file))
+                    except (OSError, ValueError, KeyError) as e:
+                        self.terminal_output.append(f"读取流水线预设 {file} 失败: {str(e)}", logging.WARNING)
+        except OSError:
+            pass
+
+        self.pipeline_preset_combo.clear()
+        self.pipeline_preset_combo.addItem("选择预设...")
+        self.pipeline_preset_combo.addItems(list(self.pipeline_presets))
+
+    def load_pipeline_preset(self, index):
+        """把预设的各阶段显示到阶段选择框中"""
+        pipeline = self.pipeline_presets.get(self.pipeline_preset_combo.itemText(index))
+        if pipeline is None:
+            return
+        self.pipeline_options = {name: options for name, options in pipeline.stages}
+        names = [name for name, _ in pipeline.stages]
+        self.pipeline_stage_combos['transform'].setCurrentIndex(0)
+        for name in names:
+            combo = self.pipeline_stage_combos[PIPELINE_STAGES[name]['role']]
+            combo.setCurrentIndex(combo.findData(name))
+
+    def current_pipeline(self):
+        """根据阶段选择框生成流水线，参数沿用所选预设中的参数"""
+        options = getattr(self, 'pipeline_options', {})
+        names = [self.pipeline_stage_combos[role].currentData()
+                 for role in ("source", "transform", "sink")]
+        return Pipeline([(name, options.get(name, {})) for name in names if name])
+
+    def select_pipeline_input(self):
+        """选择流水线的输入文件"""
+        source = self.pipeline_stage_combos['source'].currentData()
+        if source == "images":
+            file_paths, _ = QFileDialog.getOpenFileNames(self, "选择图片文件", "", "图片文件 (*.png *.jpg *.jpeg)")
+            if file_paths:
+                self.pipeline_input = file_paths
+                self.pipeline_input_label.setText(f"已选择 {len(file_paths)} 张图片")
+            return
+
+        filters = {"pdf_tables": "PDF文件 (*.pdf)", "excel_sheets": "Excel文件 (*.xlsx *.xls)",
+                   "gif_frames": "GIF文件 (*.gif)"}
+        file_path, _ = QFileDialog.getOpenFileName(self, "选择输入文件", "", filters.get(source, "所有文件 (*)"))
+        if file_path:
+            self.pipeline_input = file_path
+            self.pipeline_input_label.setText(file_path)
+
+    def run_pipeline(self):
+        """在后台线程运行流水线
+        Run the pipeline in a background thread
+        """
+        try:
+            pipeline = self.current_pipeline()
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
+        if not getattr(self, 'pipeline_input', None):
+            QMessageBox.warning(self, "警告", "请先选择输入文件")
+            return
+
+        sink = pipeline.stages[-1][0]
+        if sink in ("write_sheets", "write_frames"):
+            output = QFileDialog.getExistingDirectory(self, "选择输出目录")
+        else:
+            suffix = "GIF文件 (*.gif)" if sink == "write_gif" else "Excel文件 (*.xlsx)"
+            output, _ = QFileDialog.getSaveFileName(self, "保存结果", "", suffix)
+        if not output:
+            return
+
+        self.run_pipeline_btn.setEnabled(False)
+        self.terminal_output.append(f"开始运行流水线: {' -> '.join(name for name, _ in pipeline.stages)}")
+        self.pipeline_thread = PipelineWorker(pipeline, self.pipeline_input, output)
+        self.pipeline_thread.progress.connect(self.terminal_output.append)
+        self.pipeline_thread.done.connect(self.on_pipeline_done)
+        self.pipeline_thread.start()
+
+    def cancel_pipeline(self):
+        """取消正在运行的流水线"""
+        if getattr(self, 'pipeline_thread', None) and self.pipeline_thread.isRunning():
+            self.pipeline_thread.cancel.set()
+
+    def on_pipeline_done(self, ok, message):
+        """流水线运行结束"""
+        self.run_pipeline_btn.setEnabled(True)
+        self.terminal_output.append(message, logging.INFO if ok else logging.ERROR)
+
+    def save_pipeline_preset(self):
+        """把当前流水线保存为预设"""
+        try:
+            pipeline = self.current_pipeline()
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
+        os.makedirs(PIPELINE_PRESET_DIR, exist_ok=True)
+        file_path, _ = QFileDialog.getSaveFileName(self, "保存流水线预设", PIPELINE_PRESET_DIR, "JSON文件 (*.json)")
+        if file_path:
+            try:
+                pipeline.save(file_path)
+                self.refresh_pipeline_presets()
+                QMessageBox.information(self, "成功", f"预设已保存到: {file_path}")
+            except Exception as e:
+                QMessageBox.critical(self, "错误", f"保存失败: {str(e)}")
+
+    def refresh_cache_stats(self):
+        """刷新转换结果缓存的统计"""
+        stats = result_cache.stats()
+        self.cache_stats_label.setText(
+            f"缓存条目: {stats['entries']}  占用: {stats['bytes'] / 1024 / 1024:.1f}MB / "
+            f"{stats['max_bytes'] / 1024 / 1024:.0f}MB\n"
+            f"本次命中: {stats['hits']}  未命中: {stats['misses']}  命中率: {stats['hit_rate']:.0%}")
+
+    def set_result_cache_enabled(self, enabled):
+        """启用或关闭转换结果缓存"""
+        result_cache.enabled = enabled
+
+    def clear_result_cache(self):
+        """清空转换结果缓存"""
+        result_cache.invalidate()
+        self.refresh_cache_stats()
+        self.terminal_output.append("转换结果缓存已清空")
+
     def select_images_for_gif(self):
         """选择图片文件用于GIF合并"""
         file_paths, _ = QFileDialog.getOpenFileNames(self, "选择图片文件", "", "图片文件 (*.png *.jpg *.jpeg)")
         if file_paths:
             self.gif_merge_status_label.setText(f"已选择 {len(file_paths)} 张图片")
             self.selected_images = file_paths
+            self.merge_thumbnail_model.set_items([(path, 0) for path in file_paths])
 
     def merge_images_to_gif(self):
         """合并图片为GIF"""
@@ -1007,16 +3307,550 @@ class MainWindow(QMainWindow):
             if not output_path:
                 return
 
-            # 打开所有图片
-            images = [Image.open(path) for path in self.selected_images]
-
             # 合并图片为GIF
-            images[0].save(output_path, save_all=True, append_images=images[1:], loop=0, duration=interval)
+            cached_file_conversion("merge_images", merge_images, self.selected_images, output_path,
+                                   interval=interval)
             QMessageBox.information(self, "成功", f"GIF已保存到: {output_path}")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"合并失败: {str(e)}")
 
 
+class LogConsole(QWidget):
+    """日志控制台：固定大小的环形缓冲区，定时批量刷新界面，支持级别过滤和日志文件
+    Log console backed by a ring buffer with batched UI flushes
+    """
+    LEVELS = [("全部", logging.DEBUG), ("信息", logging.INFO),
+              ("警告", logging.WARNING), ("错误", logging.ERROR)]
+
+    def __init__(self, capacity=5000, flush_interval=100, log_file=None,
+                 max_bytes=5 * 1024 * 1024, backup_count=3):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+        # 工具在界面线程中同步运行时定时器无法刷新，待显示的日志同样只保留最新的capacity条
+        self.pending = collections.deque(maxlen=capacity)
+        self.min_level = logging.INFO
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.file_handler = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        self.level_combo = QComboBox()
+        for label, level in self.LEVELS:
+            self.level_combo.addItem(label, level)
+        self.level_combo.setCurrentIndex(1)
+        self.level_combo.currentIndexChanged.connect(self.on_level_changed)
+        header.addWidget(QLabel("日志级别:"))
+        header.addWidget(self.level_combo)
+
+        self.file_checkbox = QCheckBox("保存日志到文件")
+        self.file_checkbox.setEnabled(log_file is not None)
+        self.file_checkbox.toggled.connect(self.set_file_logging)
+        header.addWidget(self.file_checkbox)
+
+        clear_btn = QPushButton("清空")
+        clear_btn.clicked.connect(self.clear)
+        header.addWidget(clear_btn)
+        header.addStretch()
+        layout.addLayout(header)
+
+        # 文本区域最多保留与缓冲区相同的行数
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setMaximumBlockCount(capacity)
+        self.view.setStyleSheet("background-color: #f5f5f5; border-radius: 10px;")
+        self.view.setMinimumHeight(200)
+        layout.addWidget(self.view)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(flush_interval)
+
+    def append(self, text, level=logging.INFO):
+        """添加一条日志，立即写入日志文件，界面显示由定时器批量完成"""
+        self.pending.append((level, time.strftime("%H:%M:%S"), text))
+        # 在这里写文件，缓冲区满后被丢弃的日志也会保留在文件中
+        if self.file_handler is not None:
+            self.file_handler.handle(logging.LogRecord(
+                "LittleToolkit", level, "", 0, text, None, None))
+
+    def format_record(self, record):
+        level, timestamp, text = record
+        return f"[{timestamp}] {logging.getLevelName(level)}: {text}"
+
+    def flush(self):
+        """把缓冲的日志一次性显示到界面"""
+        if not self.pending:
+            return
+        batch = []
+        while self.pending:
+            batch.append(self.pending.popleft())
+        self.records.extend(batch)
+
+        # 缓冲区容量以内的日志才需要显示
+        lines = [self.format_record(record) for record in batch[-self.records.maxlen:]
+                 if record[0] >= self.min_level]
+        if lines:
+            self.view.appendPlainText("\n".join(lines))
+
+    def on_level_changed(self, index):
+        """切换过滤级别后按缓冲区内容重新显示"""
+        self.min_level = self.level_combo.itemData(index)
+        self.flush()
+        self.view.setPlainText("\n".join(
+            self.format_record(record) for record in self.records if record[0] >= self.min_level))
+        self.view.moveCursor(QTextCursor.End)
+
+    def set_file_logging(self, enabled):
+        """开启或关闭滚动日志文件"""
+        if enabled and self.file_handler is None:
+            try:
+                os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+                self.file_handler = logging.handlers.RotatingFileHandler(
+                    self.log_file, maxBytes=self.max_bytes, backupCount=self.backup_count,
+                    encoding='utf-8')
+                self.file_handler.setFormatter(logging.Formatter(
+                    "%(asctime)s %(levelname)s: %(message)s"))
+            except OSError as e:
+                self.append(f"无法打开日志文件: {str(e)}", logging.ERROR)
+                self.file_checkbox.setChecked(False)
+        elif not enabled and self.file_handler is not None:
+            self.file_handler.close()
+            self.file_handler = None
+
+    def clear(self):
+        """清空缓冲区和显示"""
+        self.flush()
+        self.records.clear()
+        self.view.clear()
+
+
+class ReplSession:
+    """持久化代码执行会话，命名空间在多次运行之间保留
+    Persistent code execution session whose namespace survives between runs
+    """
+
+    def __init__(self):
+        self.short_repr = reprlib.Repr()
+        self.short_repr.maxstring = 60
+        self.short_repr.maxother = 60
+        self.restart()
+
+    def restart(self):
+        """清空命名空间和执行计数"""
+        self.namespace = {'__name__': '__main__'}
+        self.execution_count = 0
+
+    def run(self, code):
+        """执行代码，返回(输出文本, 是否成功)
+        最后一条语句若是表达式，则像交互式解释器一样显示其值
+        """
+        self.execution_count += 1
+        filename = f"<cell-{self.execution_count}>"
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                tree = ast.parse(code, filename, 'exec')
+                last_expr = None
+                if tree.body and isinstance(tree.body[-1], ast.Expr):
+                    last_expr = ast.Expression(tree.body.pop().value)
+
+                exec(compile(tree, filename, 'exec'), self.namespace)
+                if last_expr is not None:
+                    value = eval(compile(last_expr, filename, 'eval'), self.namespace)
+                    if value is not None:
+                        self.namespace['_'] = value
+                        print(repr(value))
+            return output.getvalue(), True
+        except SyntaxError as e:
+            output.write(''.join(traceback.format_exception_only(type(e), e)))
+            return output.getvalue(), False
+        except Exception as e:
+            # 去掉会话自身的调用帧，只保留用户代码的堆栈
+            output.write(''.join(traceback.format_exception(type(e), e, e.__traceback__.tb_next)))
+            return output.getvalue(), False
+
+    def variables(self):
+        """返回用户变量列表 [(名称, 类型, 简要值)]"""
+        result = []
+        for name, value in self.namespace.items():
+            if name.startswith('_'):
+                continue
+            result.append((name, type(value).__name__, self.short_repr.repr(value)))
+        return sorted(result)
+
+    def describe(self, name):
+        """返回变量的完整描述"""
+        if name not in self.namespace:
+            return "变量不存在"
+        try:
+            return repr(self.namespace[name])
+        except Exception as e:
+            return f"无法显示: {str(e)}"
+
+
+class PluginScanWorker(QThread):
+    """后台并行扫描已安装插件目录的线程"""
+    loaded = pyqtSignal(dict, list)
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+
+    def run(self):
+        """扫描插件目录并发送结果"""
+        plugins, errors = scan_installed_plugins(self.directory)
+        self.loaded.emit(plugins, errors)
+
+
+class PluginPrewarmWorker(QThread):
+    """后台预加载插件依赖并编译代码的线程"""
+
+    def __init__(self, plugins):
+        super().__init__()
+        self.plugins = plugins
+
+    def run(self):
+        """依次预热插件，失败时只打印错误"""
+        for plugin in self.plugins:
+            try:
+                plugin.prewarm()
+            except Exception as e:
+                print(f"插件 {plugin.name} 预热失败: {str(e)}")
+
+
+class PythonHighlighter(QSyntaxHighlighter):
+    """Python语法高亮，每次只处理内容发生变化的文本块
+    Block-level Python highlighter; Qt only rehighlights changed blocks
+    """
+    KEYWORDS = ('and', 'as', 'assert', 'async', 'await', 'break', 'class', 'continue', 'def',
+                'del', 'elif', 'else', 'except', 'False', 'finally', 'for', 'from', 'global',
+                'if', 'import', 'in', 'is', 'lambda', 'None', 'nonlocal', 'not', 'or', 'pass',
+                'raise', 'return', 'True', 'try', 'while', 'with', 'yield')
+    # 块状态：是否位于跨行的三引号字符串中
+    IN_SINGLE, IN_DOUBLE = 1, 2
+    TRIPLE_QUOTE = re.compile(r"'''|\"\"\"")
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.formats = {
+            'keyword': self.make_format("#0000c0", bold=True),
+            'number': self.make_format("#a05000"),
+            'definition': self.make_format("#a000a0", bold=True),
+            'string': self.make_format("#008000"),
+            'comment': self.make_format("#808080", italic=True),
+        }
+        self.rules = [
+            (re.compile(r'\b(?:' + '|'.join(self.KEYWORDS) + r')\b'), 'keyword'),
+            (re.compile(r'\b\d+(?:\.\d+)?\b'), 'number'),
+            (re.compile(r'\b(?:def|class)\s+(\w+)'), 'definition'),
+        ]
+        # 字符串和注释一起匹配，字符串中的#不会被当成注释
+        self.string_or_comment = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|#.*$')
+
+    @staticmethod
+    def make_format(color, bold=False, italic=False):
+        text_format = QTextCharFormat()
+        text_format.setForeground(QColor(color))
+        if bold:
+            text_format.setFontWeight(QFont.Bold)
+        text_format.setFontItalic(italic)
+        return text_format
+
+    def highlightBlock(self, text):
+        """高亮一个文本块，块状态变化时Qt会继续处理下一个块"""
+        for pattern, name in self.rules:
+            group = 1 if pattern.groups else 0
+            for match in pattern.finditer(text):
+                start, end = match.span(group)
+                self.setFormat(start, end - start, self.formats[name])
+        for match in self.string_or_comment.finditer(text):
+            name = 'comment' if match.group().startswith('#') else 'string'
+            self.setFormat(match.start(), match.end() - match.start(), self.formats[name])
+
+        # 跨行的三引号字符串，状态通过块状态传给下一个块
+        self.setCurrentBlockState(0)
+        state, start, offset = self.previousBlockState(), 0, 0
+        while True:
+            if state in (self.IN_SINGLE, self.IN_DOUBLE):
+                delimiter = "'''" if state == self.IN_SINGLE else '"""'
+                end = text.find(delimiter, offset)
+                if end < 0:
+                    self.setFormat(start, len(text) - start, self.formats['string'])
+                    self.setCurrentBlockState(state)
+                    return
+                self.setFormat(start, end + 3 - start, self.formats['string'])
+                offset = end + 3
+            match = self.TRIPLE_QUOTE.search(text, offset)
+            if match is None:
+                return
+            state = self.IN_SINGLE if match.group() == "'''" else self.IN_DOUBLE
+            start, offset = match.start(), match.end()
+
+
+class ChunkedTextLoader(QObject):
+    """在事件循环的空隙中分块读入文本文件，避免大文件阻塞界面"""
+    progress = pyqtSignal(int)
+    finished = pyqtSignal()
+
+    def __init__(self, file, editor, size):
+        super().__init__()
+        self.file = file
+        self.editor = editor
+        self.size = max(size, 1)
+        self.read_bytes = 0
+        self.trailing_newline = False
+        self.timer = QTimer()
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.load_chunk)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.file.close()
+
+    def load_chunk(self):
+        """读入一块完整的行追加到文档末尾"""
+        lines = self.file.readlines(CODE_CHUNK_BYTES)
+        if not lines:
+            # 文件以换行结尾时末尾还有一个空行
+            if self.trailing_newline:
+                self.editor.appendPlainText("")
+            self.stop()
+            self.finished.emit()
+            return
+
+        chunk = ''.join(lines)
+        self.read_bytes += len(chunk.encode('utf-8', errors='replace'))
+        chunk = chunk.replace('\r\n', '\n').replace('\r', '\n')
+        self.trailing_newline = chunk.endswith('\n')
+        # appendPlainText会另起一段，去掉块末尾的换行
+        self.editor.appendPlainText(chunk[:-1] if self.trailing_newline else chunk)
+        self.progress.emit(min(100, self.read_bytes * 100 // self.size))
+
+
+class ThumbnailLoader(QObject):
+    """在线程池中生成缩略图，结果通过信号发回界面线程
+    同一次绘制中请求的缩略图按文件合并，每个文件的各帧在一次顺序解码中生成
+    每个缩略图列表使用自己的加载器，取消请求不会影响其他列表
+    """
+    ready = pyqtSignal(str, QImage)
+
+    def __init__(self, cache, workers=None):
+        super().__init__()
+        self.cache = cache
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or min(8, os.cpu_count() or 2))
+        self.pending = set()
+        self.generation = 0
+        # {(文件路径, 尺寸): {帧号: 键}}，下一轮事件循环时一起提交
+        self.batches = {}
+        self.flush_timer = QTimer()
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(20)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def request(self, key, path, frame, size):
+        """请求一张缩略图，已在队列中的请求不会重复提交"""
+        if key in self.pending:
+            return
+        self.pending.add(key)
+        self.batches.setdefault((path, size), {})[frame] = key
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        """按文件提交合并后的请求"""
+        batches, self.batches = self.batches, {}
+        for (path, size), keys in batches.items():
+            self.executor.submit(self.load, path, keys, size, self.generation)
+
+    def cancel_pending(self):
+        """放弃尚未开始的请求，例如切换了文件之后"""
+        self.generation += 1
+        self.pending.clear()
+        self.batches.clear()
+
+    def load(self, path, keys, size, generation):
+        """在工作线程中按帧号顺序生成一个文件的缩略图"""
+        remaining = dict(keys)
+        try:
+            for frame, cache_path in self.cache.thumbnails(path, keys, size):
+                if generation != self.generation:
+                    return
+                self.ready.emit(remaining.pop(frame), QImage(cache_path))
+        except Exception as e:
+            print(f"生成缩略图失败: {path} {str(e)}")
+        # 失败的请求也要通知，之后可以重新请求
+        for key in remaining.values():
+            self.ready.emit(key, QImage())
+
+
+class ThumbnailModel(QAbstractListModel):
+    """缩略图列表模型，视图请求某一项的图标时才加载该项的缩略图
+    Thumbnail list model that loads previews only for items the view asks for
+    """
+    SIZE = 96
+    MEMORY_LIMIT = 500
+
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+        self.items = []
+        self.rows = {}
+        self.pixmaps = collections.OrderedDict()
+        loader.ready.connect(self.on_ready)
+
+    def set_items(self, items):
+        """设置条目列表，每项为(文件路径, 帧号)"""
+        self.loader.cancel_pending()
+        self.beginResetModel()
+        self.items = items
+        self.rows = {f"{path}|{frame}": row for row, (path, frame) in enumerate(items)}
+        self.pixmaps.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path, frame = self.items[index.row()]
+        if role == Qt.DisplayRole:
+            return f"第 {frame} 帧" if frame or path.lower().endswith('.gif') else os.path.basename(path)
+        if role == Qt.ToolTipRole:
+            return path
+        if role == Qt.DecorationRole:
+            key = f"{path}|{frame}"
+            pixmap = self.pixmaps.get(key)
+            if pixmap is not None:
+                self.pixmaps.move_to_end(key)
+                return pixmap
+            self.loader.request(key, path, frame, self.SIZE)
+        return None
+
+    def on_ready(self, key, image):
+        """缩略图生成完成，更新对应的条目"""
+        self.loader.pending.discard(key)
+        row = self.rows.get(key)
+        if row is None or image.isNull():
+            return
+        self.pixmaps[key] = QPixmap.fromImage(image)
+        # 内存中只保留最近使用的缩略图，其余的需要时从磁盘缓存读取
+        while len(self.pixmaps) > self.MEMORY_LIMIT:
+            self.pixmaps.popitem(last=False)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class PluginCatalogModel(QAbstractListModel):
+    """插件目录列表模型，支持过滤和分页加载
+    List model for the plugin catalog with filtering and incremental paging
+    """
+    PAGE_SIZE = 200
+
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+        self.matches = []
+        self.loaded = 0
+
+    def set_entries(self, entries):
+        """设置全部插件条目"""
+        self.entries = entries
+        for entry in entries:
+            entry['search_text'] = " ".join(
+                (entry['name'], entry['description'], entry['category'])).lower()
+        self.set_filter("")
+
+    def set_filter(self, text):
+        """按关键字过滤，重置分页"""
+        text = text.strip().lower()
+        self.beginResetModel()
+        self.matches = [entry for entry in self.entries if text in entry['search_text']]
+        self.loaded = min(self.PAGE_SIZE, len(self.matches))
+        self.endResetModel()
+
+    def match_count(self):
+        return len(self.matches)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return None
+        entry = self.matches[index.row()]
+        if role == Qt.DisplayRole:
+            return entry['name']
+        if role == Qt.ToolTipRole:
+            return entry['description']
+        if role == Qt.UserRole:
+            return entry
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.matches)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """滚动到底部时加载下一页"""
+        count = min(self.PAGE_SIZE, len(self.matches) - self.loaded)
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+
+class CatalogScanWorker(QThread):
+    """后台扫描插件目录的线程"""
+    loaded = pyqtSignal(list)
+
+    def __init__(self, directories):
+        super().__init__()
+        self.directories = directories
+
+    def run(self):
+        """扫描插件目录并发送结果"""
+        try:
+            entries = scan_plugin_catalog(self.directories)
+        except Exception as e:
+            print(f"扫描插件目录失败: {str(e)}")
+            entries = []
+        self.loaded.emit(entries)
+
+
+class PipelineWorker(QThread):
+    """后台运行流水线的线程"""
+    progress = pyqtSignal(str, int)
+    done = pyqtSignal(bool, str)
+
+    def __init__(self, pipeline, source, output):
+        super().__init__()
+        self.pipeline = pipeline
+        self.source = source
+        self.output = output
+        self.cancel = threading.Event()
+
+    def run(self):
+        """运行流水线并发送结果"""
+        try:
+            count = self.pipeline.run(self.source, self.output,
+                                      lambda text, level=logging.INFO: self.progress.emit(text, level),
+                                      self.cancel)
+            self.done.emit(True, f"流水线完成，共输出 {count} 项到 {self.output}")
+        except PipelineCancelled:
+            self.done.emit(False, "流水线已取消")
+        except Exception as e:
+            self.done.emit(False, f"流水线运行失败: {str(e)}")
+
+
 class SearchWorker(QThread):
     found_match = pyqtSignal(str)  # 信号，用于发送找到的匹配项
 
@@ -1028,28 +3862,16 @@ class SearchWorker(QThread):
     def run(self):
         """执行搜索的线程方法"""
         try:
-            for root, dirs, files in os.walk(self.search_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-
-                    # 检查文件名匹配
-                    if self.query in file.lower():
-                        self.found_match.emit(f"文件名匹配: {file_path}")
-
-                    # 检查文件内容匹配
-                    if file.endswith(('.txt', '.py', '.md', '.html', '.js', '.css')):
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                for line in f:
-                                    if self.query in line.lower():
-                                        self.found_match.emit(f"内容匹配: {file_path}")
-                                        break
-                        except (UnicodeDecodeError, PermissionError):
-                            continue
+            with metrics.timer("search"):
+                for match in search_files(self.query, self.search_dir):
+                    metrics.count("search.matches")
+                    self.found_match.emit(match)
         except Exception as e:
             self.found_match.emit(f"搜索出错: {str(e)}")
 
 if __name__ == "__main__":
+    # 打包成可执行文件后，插件宿主子进程需要这一步
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
 
     # 设置应用程序样式
@@ -0,0 +1,421 @@
+"""LittleToolkit 基准测试
+Benchmark suite for LittleToolkit tool operations
+
+在生成的测试文件上无界面地运行各个工具，记录耗时、峰值内存和吞吐量，
+结果保存为JSON，并可与之前保存的基准结果对比。
+
+用法:
+    python benchmark.py --scale small --output bench.json
+    python benchmark.py --scale small --baseline bench.json --fail-on-regression
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import LittleToolkit as toolkit
+
+
+# 不同规模的测试文件参数
+SCALES = {
+    "small": dict(pdf_pages=5, table_rows=20, excel_sheets=5, excel_rows=1000, excel_cols=10,
+                  gif_frames=50, gif_size=(200, 200), images=30, image_size=(320, 240),
+                  tree_dirs=20, tree_files=20),
+    "medium": dict(pdf_pages=30, table_rows=40, excel_sheets=20, excel_rows=10000, excel_cols=15,
+                   gif_frames=500, gif_size=(320, 240), images=200, image_size=(640, 480),
+                   tree_dirs=100, tree_files=50),
+    "large": dict(pdf_pages=200, table_rows=40, excel_sheets=50, excel_rows=50000, excel_cols=20,
+                  gif_frames=5000, gif_size=(320, 240), images=1000, image_size=(640, 480),
+                  tree_dirs=500, tree_files=100),
+}
+
+WORDS = ["alpha", "beta", "gamma", "delta", "toolkit", "excel", "gif", "plugin", "search", "数据"]
+SEARCH_NEEDLE = "needle"
+
+
+def peak_rss():
+    """返回当前进程的峰值内存(字节)，无法获取时返回None"""
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS上单位是字节，Linux上是KB
+        return usage if sys.platform == "darwin" else usage * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    except ImportError:
+        return None
+
+
+# 以下是测试文件生成函数，使用固定随机种子保证可重复
+def make_pdf(path, pages, rows, rng):
+    """生成每页带一个表格的PDF"""
+    import fitz
+
+    doc = fitz.open()
+    cols, cell_w, cell_h, left, top = 4, 120, 18, 50, 60
+    for page_no in range(pages):
+        page = doc.new_page()
+        page.insert_text((left, 40), f"Page {page_no + 1}", fontsize=14)
+        for r in range(rows + 1):
+            y = top + r * cell_h
+            page.draw_line((left, y), (left + cols * cell_w, y))
+        for c in range(cols + 1):
+            x = left + c * cell_w
+            page.draw_line((x, top), (x, top + rows * cell_h))
+        for r in range(rows):
+            for c in range(cols):
+                text = f"{rng.choice(WORDS)}{rng.randint(0, 9999)}" if c else f"row{r}"
+                page.insert_text((left + c * cell_w + 4, top + r * cell_h + 13), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def make_xlsx(path, sheets, rows, cols, rng):
+    """生成多工作表的.xlsx文件"""
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    for sheet_no in range(sheets):
+        sheet = wb.create_sheet(f"Sheet{sheet_no + 1}")
+        sheet.append([f"col{c}" for c in range(cols)])
+        for _ in range(rows):
+            sheet.append([rng.randint(0, 100000) if c % 2 else rng.choice(WORDS) for c in range(cols)])
+    wb.save(path)
+
+
+def make_xls(path, sheets, rows, cols, rng):
+    """生成多工作表的.xls文件，需要xlwt"""
+    import xlwt
+
+    wb = xlwt.Workbook()
+    for sheet_no in range(sheets):
+        sheet = wb.add_sheet(f"Sheet{sheet_no + 1}")
+        for c in range(cols):
+            sheet.write(0, c, f"col{c}")
+        # .xls每个工作表最多65536行
+        for r in range(1, min(rows, 65535) + 1):
+            for c in range(cols):
+                sheet.write(r, c, rng.randint(0, 100000) if c % 2 else rng.choice(WORDS))
+    wb.save(path)
+
+
+def make_gif(path, frames, size, rng):
+    """生成多帧GIF"""
+    from PIL import Image, ImageDraw
+
+    images = []
+    for i in range(frames):
+        image = Image.new("P", size, color=i % 256)
+        draw = ImageDraw.Draw(image)
+        x, y = rng.randint(0, size[0] - 20), rng.randint(0, size[1] - 20)
+        draw.rectangle((x, y, x + 20, y + 20), fill=(i * 7) % 256)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], loop=0, duration=40)
+
+
+def make_images(directory, count, size, rng):
+    """生成一组PNG图片，返回路径列表"""
+    from PIL import Image, ImageDraw
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        image = Image.new("RGB", size, color=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+        draw = ImageDraw.Draw(image)
+        draw.ellipse((10, 10, size[0] - 10, size[1] - 10), outline=(255, 255, 255), width=3)
+        path = os.path.join(directory, f"image_{i:05d}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def make_tree(directory, dirs, files_per_dir, rng):
+    """生成用于搜索的目录树，部分文件包含关键字"""
+    extensions = [".txt", ".py", ".md", ".bin"]
+    for d in range(dirs):
+        sub = os.path.join(directory, f"dir{d // 10}", f"sub{d}")
+        os.makedirs(sub, exist_ok=True)
+        for f in range(files_per_dir):
+            words = [rng.choice(WORDS) for _ in range(200)]
+            if rng.random() < 0.05:
+                words.insert(rng.randint(0, len(words)), SEARCH_NEEDLE)
+            with open(os.path.join(sub, f"file{f}{rng.choice(extensions)}"), "w", encoding="utf-8") as fp:
+                fp.write(" ".join(words))
+
+
+def generate_fixtures(directory, scale, seed):
+    """生成全部测试文件，返回{名称: 路径}，缺少依赖的测试文件会被跳过"""
+    params = SCALES[scale]
+    fixtures = {}
+    makers = [
+        ("pdf", lambda p, rng: make_pdf(p, params["pdf_pages"], params["table_rows"], rng), "tables.pdf"),
+        ("xlsx", lambda p, rng: make_xlsx(p, params["excel_sheets"], params["excel_rows"],
+                                          params["excel_cols"], rng), "book.xlsx"),
+        ("xls", lambda p, rng: make_xls(p, params["excel_sheets"], params["excel_rows"],
+                                        params["excel_cols"], rng), "book.xls"),
+        ("gif", lambda p, rng: make_gif(p, params["gif_frames"], params["gif_size"], rng), "long.gif"),
+        ("images", lambda p, rng: make_images(p, params["images"], params["image_size"], rng), "images"),
+        ("tree", lambda p, rng: make_tree(p, params["tree_dirs"], params["tree_files"], rng), "tree"),
+    ]
+    for name, maker, filename in makers:
+        path = os.path.join(directory, filename)
+        try:
+            # 每个测试文件使用独立的随机数生成器，跳过某个文件不会影响其他文件的内容
+            maker(path, random.Random(f"{seed}-{name}"))
+            fixtures[name] = path
+        except ImportError as e:
+            print(f"跳过测试文件 {filename}: 缺少依赖 {e.name}")
+    return fixtures
+
+
+def load_fixtures(fixture_dir, scale, seed):
+    """读取目录中已有的测试文件，规模或种子不同时重新生成"""
+    manifest_path = os.path.join(fixture_dir, "fixtures.json")
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("scale") == scale and manifest.get("seed") == seed:
+            return manifest["fixtures"]
+        print(f"测试文件的规模或种子与本次不同，重新生成: {fixture_dir}")
+        # 只删除上次生成的测试文件
+        # 旧版本的清单直接是{名称: 路径}
+        for path in manifest.get("fixtures", manifest).values():
+            if not isinstance(path, str):
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+    else:
+        os.makedirs(fixture_dir, exist_ok=True)
+        print(f"正在生成测试文件: {fixture_dir}")
+
+    fixtures = generate_fixtures(fixture_dir, scale, seed)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"scale": scale, "seed": seed, "fixtures": fixtures}, f, ensure_ascii=False, indent=2)
+    return fixtures
+
+
+def path_size(path):
+    """文件或目录的总字节数"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            total += os.path.getsize(os.path.join(root, file))
+    return total
+
+
+# 以下是各个测试用例，params为测试规模参数，返回(处理的单位数, 单位名称)
+def case_pdf_to_excel(fixtures, output_dir, params):
+    return toolkit.pdf_to_excel(fixtures["pdf"], os.path.join(output_dir, "tables.xlsx")), "rows"
+
+
+def case_pdf_to_word(fixtures, output_dir, params):
+    toolkit.pdf_to_word(fixtures["pdf"], os.path.join(output_dir, "tables.docx"))
+    return params["pdf_pages"], "pages"
+
+
+def case_split_xlsx(fixtures, output_dir, params):
+    return len(toolkit.split_excel_file(fixtures["xlsx"], output_dir)), "sheets"
+
+
+def case_split_xls(fixtures, output_dir, params):
+    return len(toolkit.split_excel_file(fixtures["xls"], output_dir)), "sheets"
+
+
+def case_split_gif(fixtures, output_dir, params):
+    return toolkit.split_gif_file(fixtures["gif"], output_dir), "frames"
+
+
+def case_merge_gif(fixtures, output_dir, params):
+    images = sorted(os.path.join(fixtures["images"], name) for name in os.listdir(fixtures["images"]))
+    toolkit.merge_images(images, os.path.join(output_dir, "merged.gif"), 100)
+    return len(images), "images"
+
+
+def case_search(fixtures, output_dir, params):
+    for _ in toolkit.search_files(SEARCH_NEEDLE, fixtures["tree"]):
+        pass
+    return params["tree_dirs"] * params["tree_files"], "files"
+
+
+# 用例名称: (函数, 依赖的测试文件)
+CASES = {
+    "convert_pdf_to_excel": (case_pdf_to_excel, "pdf"),
+    "convert_pdf_to_word": (case_pdf_to_word, "pdf"),
+    "split_excel_sheets_xlsx": (case_split_xlsx, "xlsx"),
+    "split_excel_sheets_xls": (case_split_xls, "xls"),
+    "split_gif_frames": (case_split_gif, "gif"),
+    "merge_images_to_gif": (case_merge_gif, "images"),
+    "search": (case_search, "tree"),
+}
+
+def run_case_in_child(case_name, fixtures, scale, queue):
+    """在子进程中运行一次用例，保证峰值内存互不影响"""
+    func, _ = CASES[case_name]
+    output_dir = tempfile.mkdtemp(prefix="ltk_bench_out_")
+    try:
+        rss_before = peak_rss()
+        start = time.perf_counter()
+        units, unit_name = func(fixtures, output_dir, SCALES[scale])
+        elapsed = time.perf_counter() - start
+        queue.put({"wall_time": elapsed, "units": units, "unit_name": unit_name,
+                   "rss_before": rss_before, "peak_rss": peak_rss()})
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {str(e)}"})
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def wait_for_child(proc, queue, timeout):
+    """等待子进程的结果，子进程崩溃或超时时返回错误而不是一直等待"""
+    deadline = time.monotonic() + timeout if timeout else None
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except queue_module.Empty:
+            pass
+        if not proc.is_alive():
+            # 子进程退出前可能刚好放入了结果
+            try:
+                return queue.get(timeout=1)
+            except queue_module.Empty:
+                return {"error": f"子进程异常退出，退出码 {proc.exitcode}"}
+        if deadline and time.monotonic() > deadline:
+            proc.terminate()
+            return {"error": f"超过 {timeout} 秒未完成"}
+
+
+def run_case(case_name, fixtures, scale, repeat, timeout=None):
+    """重复运行用例，返回汇总结果"""
+    ctx = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=run_case_in_child, args=(case_name, fixtures, scale, queue))
+        proc.start()
+        result = wait_for_child(proc, queue, timeout)
+        proc.join()
+        if "error" in result:
+            return result
+        runs.append(result)
+
+    wall_times = [run["wall_time"] for run in runs]
+    median = statistics.median(wall_times)
+    input_bytes = path_size(fixtures[CASES[case_name][1]])
+    peaks = [run["peak_rss"] for run in runs if run["peak_rss"] is not None]
+    # 子进程导入PyQt5、pandas等模块本身就占用不少内存，运行用例前后峰值的差才是用例本身的占用
+    deltas = [run["peak_rss"] - run["rss_before"] for run in runs
+              if run["peak_rss"] is not None and run["rss_before"] is not None]
+    return {
+        "wall_time": median,
+        "wall_times": wall_times,
+        "peak_rss": max(peaks) if peaks else None,
+        "rss_delta": max(deltas) if deltas else None,
+        "units": runs[0]["units"],
+        "unit_name": runs[0]["unit_name"],
+        "throughput": runs[0]["units"] / median if median else None,
+        "input_bytes": input_bytes,
+        "bytes_per_second": input_bytes / median if median else None,
+    }
+
+
+def compare(results, baseline, threshold):
+    """与基准结果对比，返回变慢的用例列表"""
+    regressions = []
+    print(f"\n{'用例':<28}{'基准(s)':>10}{'本次(s)':>10}{'比例':>8}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "wall_time" not in base or "wall_time" not in result:
+            continue
+        ratio = result["wall_time"] / base["wall_time"] if base["wall_time"] else float("inf")
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  变慢"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            mark = "  变快"
+        print(f"{name:<28}{base['wall_time']:>10.3f}{result['wall_time']:>10.3f}{ratio:>8.2f}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LittleToolkit 基准测试")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="测试文件规模")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例重复次数，取中位数")
+    parser.add_argument("--seed", type=int, default=0, help="生成测试文件的随机种子")
+    parser.add_argument("--cases", nargs="*", choices=sorted(CASES), help="只运行指定用例")
+    parser.add_argument("--fixtures", help="测试文件目录，规模和种子相同时直接复用")
+    parser.add_argument("--timeout", type=float, default=0, help="单次运行的超时秒数，0表示不限制")
+    parser.add_argument("--output", help="结果JSON保存路径")
+    parser.add_argument("--baseline", help="用于对比的基准结果JSON")
+    parser.add_argument("--threshold", type=float, default=0.1, help="判定变慢/变快的比例阈值")
+    parser.add_argument("--fail-on-regression", action="store_true", help="有用例变慢时返回非零退出码")
+    args = parser.parse_args(argv)
+
+    fixture_dir = args.fixtures or tempfile.mkdtemp(prefix="ltk_bench_fixtures_")
+    fixtures = load_fixtures(fixture_dir, args.scale, args.seed)
+
+    results = {}
+    try:
+        for name in args.cases or CASES:
+            if CASES[name][1] not in fixtures:
+                print(f"{name:<28}跳过(缺少测试文件)")
+                results[name] = {"skipped": True}
+                continue
+            result = run_case(name, fixtures, args.scale, args.repeat, args.timeout)
+            results[name] = result
+            if "error" in result:
+                print(f"{name:<28}失败: {result['error']}")
+            else:
+                rss = f"{result['rss_delta'] / 1024 / 1024:.1f}MB" if result["rss_delta"] is not None else "-"
+                print(f"{name:<28}{result['wall_time']:>9.3f}s  峰值内存增量 {rss:>9}  "
+                      f"{result['throughput'] or 0:>10.1f} {result['unit_name']}/s")
+    finally:
+        if not args.fixtures:
+            shutil.rmtree(fixture_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("scale") != args.scale:
+            print("警告: 基准结果的测试规模与本次不同")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
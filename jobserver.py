@@ -0,0 +1,507 @@
+"""LittleToolkit 转换任务服务
+Conversion job server and headless workers for LittleToolkit
+
+任务服务器通过HTTP接收转换任务，任务保存在SQLite数据库中，重启后不会丢失。
+任意数量的无界面工作进程(可以在其他机器上)从服务器领取任务、转换并上传结果。
+领取任务时获得一个租约，工作进程定时续约；租约过期的任务会被其他工作进程接手，
+运行时间过长的任务会被空闲的工作进程再领取一次，先完成的结果生效。
+
+用法:
+    python jobserver.py serve --port 8765 --data jobs --local-workers 2
+    python jobserver.py worker --server http://127.0.0.1:8765
+    python jobserver.py submit --server http://127.0.0.1:8765 --tool pdf_to_word a.pdf b.pdf
+    python jobserver.py status --server http://127.0.0.1:8765
+    python jobserver.py fetch --server http://127.0.0.1:8765 --output results <任务ID>
+
+服务器没有用户认证，监听其他地址时请用--token(或环境变量LTK_JOB_TOKEN)设置共享令牌，
+客户端和工作进程使用相同的令牌。
+"""
+import argparse
+import hmac
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# 可以远程执行的工具: {名称: (输出类型, 输出文件扩展名)}
+# file表示输出单个文件，dir表示输出多个文件，打包为zip返回
+JOB_TOOLS = {
+    "pdf_to_word": ("file", ".docx"),
+    "pdf_to_excel": ("file", ".xlsx"),
+    "split_excel": ("dir", ".zip"),
+    "partition_excel": ("dir", ".zip"),
+    "split_gif": ("dir", ".zip"),
+}
+
+LEASE_SECONDS = 60
+HEARTBEAT_SECONDS = 15
+STEAL_AFTER_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+
+def safe_name(filename):
+    """只保留客户端提交的文件名中的文件名部分，防止写到目录之外"""
+    name = os.path.basename(str(filename).replace("\\", "/"))
+    return name if name not in ("", ".", "..") else "input"
+
+
+def run_tool(tool, input_path, output_dir, options):
+    """在工作进程中执行工具，返回结果文件路径"""
+    import LittleToolkit as toolkit
+
+    kind, ext = JOB_TOOLS[tool]
+    base = os.path.splitext(os.path.basename(input_path))[0]
+    if kind == "file":
+        output_path = os.path.join(output_dir, base + ext)
+        func = toolkit.pdf_to_word if tool == "pdf_to_word" else toolkit.pdf_to_excel
+        func(input_path, output_path, **options)
+        if not os.path.exists(output_path):
+            raise ValueError("转换没有生成输出文件")
+        return output_path
+
+    funcs = {"split_excel": toolkit.split_excel_file, "partition_excel": toolkit.partition_excel_file,
+             "split_gif": toolkit.split_gif_file}
+    parts_dir = os.path.join(output_dir, "parts")
+    os.makedirs(parts_dir)
+    funcs[tool](input_path, parts_dir, **options)
+    zip_path = os.path.join(output_dir, base + ext)
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name in sorted(os.listdir(parts_dir)):
+            zf.write(os.path.join(parts_dir, name), name)
+    return zip_path
+
+
+class JobStore:
+    """保存在SQLite中的持久化任务队列"""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        os.makedirs(os.path.join(data_dir, "inputs"), exist_ok=True)
+        os.makedirs(os.path.join(data_dir, "results"), exist_ok=True)
+        # 所有线程共用一个数据库连接，读写都在锁内进行
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(os.path.join(data_dir, "jobs.db"), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                options TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                speculative INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                leased_at REAL,
+                lease_expires REAL,
+                created REAL NOT NULL,
+                finished REAL,
+                error TEXT,
+                result_name TEXT
+            )""")
+        self.db.commit()
+
+    def input_path(self, job_id):
+        return os.path.join(self.data_dir, "inputs", job_id)
+
+    def result_path(self, job_id):
+        return os.path.join(self.data_dir, "results", job_id)
+
+    def job(self, job_id):
+        with self.lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def jobs(self):
+        with self.lock:
+            return [dict(row) for row in self.db.execute("SELECT * FROM jobs ORDER BY created")]
+
+    def submit(self, tool, filename, options, data):
+        """保存输入文件并加入队列，返回任务ID"""
+        if tool not in JOB_TOOLS:
+            raise ValueError(f"不支持的工具: {tool}")
+        filename = safe_name(filename)
+        job_id = uuid.uuid4().hex
+        temp_path = self.input_path(job_id) + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, self.input_path(job_id))
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO jobs (id, tool, options, filename, state, created) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, tool, json.dumps(options), filename, time.time()))
+            self.db.commit()
+        return job_id
+
+    def lease(self, worker):
+        """为工作进程分配一个任务，没有可做的任务时返回None
+        依次考虑: 排队中的任务、租约已过期的任务、运行时间过长且尚未被再领取的任务
+        """
+        now = time.time()
+        with self.lock:
+            while True:
+                row = self.db.execute(
+                    "SELECT * FROM jobs WHERE state = 'queued' ORDER BY created LIMIT 1").fetchone()
+                if row is None:
+                    row = self.db.execute(
+                        "SELECT * FROM jobs WHERE state = 'running' AND lease_expires < ? "
+                        "ORDER BY lease_expires LIMIT 1", (now,)).fetchone()
+                if row is None:
+                    break
+                if row["attempts"] >= MAX_ATTEMPTS:
+                    self.db.execute(
+                        "UPDATE jobs SET state = 'failed', error = ?, finished = ? WHERE id = ?",
+                        (row["error"] or "多次尝试均未完成", now, row["id"]))
+                    continue
+                self.db.execute(
+                    "UPDATE jobs SET state = 'running', attempts = attempts + 1, speculative = 0, "
+                    "worker = ?, leased_at = ?, lease_expires = ? WHERE id = ?",
+                    (worker, now, now + LEASE_SECONDS, row["id"]))
+                self.db.commit()
+                return self.job(row["id"])
+
+            # 没有空闲任务时，再领取一次运行过久的任务，先完成的结果生效
+            row = self.db.execute(
+                "SELECT * FROM jobs WHERE state = 'running' AND speculative = 0 AND leased_at < ? "
+                "AND worker != ? ORDER BY leased_at LIMIT 1", (now - STEAL_AFTER_SECONDS, worker)).fetchone()
+            if row is not None:
+                self.db.execute("UPDATE jobs SET speculative = 1 WHERE id = ?", (row["id"],))
+            self.db.commit()
+            return self.job(row["id"]) if row is not None else None
+
+    def heartbeat(self, job_id):
+        """延长租约，任务已结束时返回False"""
+        with self.lock:
+            cursor = self.db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = 'running'",
+                (time.time() + LEASE_SECONDS, job_id))
+            self.db.commit()
+            return cursor.rowcount > 0
+
+    def complete(self, job_id, worker, data):
+        """保存结果，任务已完成时返回False"""
+        job = self.job(job_id)
+        if job is None or job["state"] != "running":
+            return False
+        stem = os.path.splitext(job["filename"])[0]
+        result_name = stem + JOB_TOOLS[job["tool"]][1]
+        temp_path = f"{self.result_path(job_id)}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        with self.lock:
+            cursor = self.db.execute(
+                "UPDATE jobs SET state = 'done', worker = ?, finished = ?, result_name = ?, error = NULL "
+                "WHERE id = ? AND state = 'running'", (worker, time.time(), result_name, job_id))
+            self.db.commit()
+            if cursor.rowcount == 0:
+                os.remove(temp_path)
+                return False
+            os.replace(temp_path, self.result_path(job_id))
+        return True
+
+    def fail(self, job_id, worker, error):
+        """记录失败，未超过重试次数时重新排队
+        只处理当前租约持有者的失败，再领取的副本失败不影响原来的执行
+        """
+        with self.lock:
+            job = self.job(job_id)
+            if job is None or job["state"] != "running" or job["worker"] != worker:
+                return
+            if job["attempts"] < MAX_ATTEMPTS:
+                self.db.execute("UPDATE jobs SET state = 'queued', error = ? WHERE id = ?", (error, job_id))
+            else:
+                self.db.execute("UPDATE jobs SET state = 'failed', error = ?, finished = ? WHERE id = ?",
+                                (error, time.time(), job_id))
+            self.db.commit()
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """任务服务器的HTTP接口"""
+    store = None
+    token = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_file(self, path, filename):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{urllib.parse.quote(filename)}")
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def authorized(self):
+        """设置了令牌时，每个请求都必须带上相同的令牌"""
+        if not self.token:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {self.token}".encode("utf-8")):
+            return True
+        self.send_json({"error": "令牌无效"}, 401)
+        return False
+
+    def route(self):
+        url = urllib.parse.urlparse(self.path)
+        return [part for part in url.path.split("/") if part], dict(urllib.parse.parse_qsl(url.query))
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        parts, _ = self.route()
+        if parts == ["jobs"]:
+            return self.send_json(self.store.jobs())
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self.store.job(parts[1])
+            if job is None:
+                return self.send_json({"error": "任务不存在"}, 404)
+            if len(parts) == 2:
+                return self.send_json(job)
+            if parts[2] == "input":
+                return self.send_file(self.store.input_path(job["id"]), job["filename"])
+            if parts[2] == "result" and job["state"] == "done":
+                return self.send_file(self.store.result_path(job["id"]), job["result_name"])
+            return self.send_json({"error": "结果尚未生成"}, 404)
+        self.send_json({"error": "未知的请求"}, 404)
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        parts, query = self.route()
+        try:
+            if parts == ["jobs"]:
+                job_id = self.store.submit(query["tool"], query.get("filename", "input"),
+                                           json.loads(query.get("options", "{}")), self.read_body())
+                return self.send_json({"id": job_id}, 201)
+            if parts == ["lease"]:
+                job = self.store.lease(json.loads(self.read_body() or b"{}").get("worker", ""))
+                if job is None:
+                    self.send_response(204)
+                    self.end_headers()
+                    return
+                return self.send_json(job)
+            if len(parts) == 3 and parts[0] == "jobs":
+                job_id, action = parts[1], parts[2]
+                if action == "heartbeat":
+                    ok = self.store.heartbeat(job_id)
+                    return self.send_json({"ok": ok}, 200 if ok else 409)
+                if action == "result":
+                    ok = self.store.complete(job_id, query.get("worker", ""), self.read_body())
+                    return self.send_json({"ok": ok}, 200 if ok else 409)
+                if action == "fail":
+                    body = json.loads(self.read_body() or b"{}")
+                    self.store.fail(job_id, body.get("worker", ""), body.get("error", ""))
+                    return self.send_json({"ok": True})
+        except (KeyError, ValueError) as e:
+            return self.send_json({"error": str(e)}, 400)
+        self.send_json({"error": "未知的请求"}, 404)
+
+
+def serve(host, port, data_dir, local_workers=0, token=None):
+    """启动任务服务器，可同时在本机启动若干工作进程"""
+    JobRequestHandler.store = JobStore(data_dir)
+    JobRequestHandler.token = token
+    server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    port = server.server_address[1]
+    print(f"任务服务器已启动: http://{host}:{port}  数据目录: {os.path.abspath(data_dir)}")
+    if not token and host not in ("127.0.0.1", "localhost", "::1"):
+        print("警告: 没有设置令牌，能访问该地址的任何人都可以查看和下载所有任务的文件")
+
+    # 监听所有地址时0.0.0.0不能作为连接地址，本机工作进程使用回环地址
+    local_host = {"0.0.0.0": "127.0.0.1", "": "127.0.0.1", "::": "[::1]"}.get(host, host)
+    local_url = f"http://{local_host}:{port}"
+    workers = []
+    for _ in range(local_workers):
+        # 不能设为守护进程：partition_excel等工具会再启动进程池，守护进程不允许创建子进程
+        proc = multiprocessing.Process(target=work, args=(local_url,), kwargs={"token": token})
+        proc.start()
+        workers.append(proc)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for proc in workers:
+            proc.terminate()
+        for proc in workers:
+            proc.join()
+
+
+def request(url, data=None, method="GET", timeout=60, token=None):
+    """发送HTTP请求，返回(状态码, 响应内容)"""
+    req = urllib.request.Request(url, data=data, method=method)
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def work(server_url, worker_name=None, poll_interval=1.0, once=False, token=None):
+    """工作进程主循环：领取任务、转换、上传结果"""
+    worker_name = worker_name or f"{socket.gethostname()}-{os.getpid()}"
+    print(f"工作进程 {worker_name} 已连接 {server_url}")
+    while True:
+        try:
+            status, body = request(f"{server_url}/lease", json.dumps({"worker": worker_name}).encode(), "POST",
+                                   token=token)
+        except OSError as e:
+            print(f"连接服务器失败: {str(e)}")
+            time.sleep(poll_interval * 5)
+            continue
+        if status == 401:
+            print("服务器拒绝了令牌")
+            return
+        if status == 204:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        job = json.loads(body)
+        process_job(server_url, worker_name, job, token)
+
+
+def process_job(server_url, worker_name, job, token=None):
+    """执行一个任务，执行期间定时续约"""
+    job_url = f"{server_url}/jobs/{job['id']}"
+    stop = threading.Event()
+
+    def keep_alive():
+        while not stop.wait(HEARTBEAT_SECONDS):
+            try:
+                status, _ = request(f"{job_url}/heartbeat", b"", "POST", token=token)
+                if status == 409:
+                    # 任务已由其他工作进程完成
+                    return
+            except OSError:
+                pass
+
+    heartbeat = threading.Thread(target=keep_alive, daemon=True)
+    heartbeat.start()
+    work_dir = tempfile.mkdtemp(prefix="ltk_job_")
+    try:
+        status, data = request(f"{job_url}/input", token=token)
+        if status != 200:
+            raise RuntimeError(f"下载输入文件失败: HTTP {status}")
+        input_path = os.path.join(work_dir, os.path.basename(job["filename"]))
+        with open(input_path, "wb") as f:
+            f.write(data)
+
+        start = time.perf_counter()
+        result_path = run_tool(job["tool"], input_path, work_dir, json.loads(job["options"]))
+        with open(result_path, "rb") as f:
+            query = urllib.parse.urlencode({"worker": worker_name})
+            status, _ = request(f"{job_url}/result?{query}", f.read(), "POST", token=token)
+        state = "完成" if status == 200 else "已由其他工作进程完成"
+        print(f"任务 {job['id']} {job['tool']} {job['filename']} {state}，耗时 {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"任务 {job['id']} 失败: {str(e)}")
+        try:
+            request(f"{job_url}/fail", json.dumps({"worker": worker_name, "error": str(e)}).encode(), "POST",
+                    token=token)
+        except OSError:
+            pass
+    finally:
+        stop.set()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LittleToolkit 转换任务服务")
+    parser.add_argument("--token", default=os.environ.get("LTK_JOB_TOKEN"),
+                        help="共享令牌，服务器、工作进程和客户端需使用相同的令牌，默认读取LTK_JOB_TOKEN")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="启动任务服务器")
+    p.add_argument("--host", default="127.0.0.1",
+                   help="监听地址，其他机器访问时使用0.0.0.0。服务器没有用户认证，此时请同时设置--token")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--data", default="jobs", help="任务数据目录")
+    p.add_argument("--local-workers", type=int, default=0, help="同时在本机启动的工作进程数")
+
+    p = sub.add_parser("worker", help="启动工作进程")
+    p.add_argument("--server", required=True)
+    p.add_argument("--name", help="工作进程名称")
+    p.add_argument("--once", action="store_true", help="队列为空时退出")
+
+    p = sub.add_parser("submit", help="提交任务")
+    p.add_argument("--server", required=True)
+    p.add_argument("--tool", required=True, choices=sorted(JOB_TOOLS))
+    p.add_argument("--options", default="{}", help="工具参数(JSON)，例如 {\"rows_per_file\": 10000}")
+    p.add_argument("files", nargs="+")
+
+    p = sub.add_parser("status", help="查看任务状态")
+    p.add_argument("--server", required=True)
+
+    p = sub.add_parser("fetch", help="下载已完成任务的结果")
+    p.add_argument("--server", required=True)
+    p.add_argument("--output", default=".")
+    p.add_argument("job_ids", nargs="+")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.host, args.port, args.data, args.local_workers, args.token)
+    elif args.command == "worker":
+        work(args.server, args.name, once=args.once, token=args.token)
+    elif args.command == "submit":
+        for path in args.files:
+            query = urllib.parse.urlencode({"tool": args.tool, "filename": os.path.basename(path),
+                                            "options": args.options})
+            with open(path, "rb") as f:
+                status, body = request(f"{args.server}/jobs?{query}", f.read(), "POST", token=args.token)
+            print(f"{path}: {json.loads(body).get('id') if status == 201 else body.decode('utf-8')}")
+    elif args.command == "status":
+        status, body = request(f"{args.server}/jobs", token=args.token)
+        if status != 200:
+            print(body.decode("utf-8"))
+            return 1
+        for job in json.loads(body):
+            print(f"{job['id']}  {job['state']:<8}{job['tool']:<16}{job['filename']}  "
+                  f"尝试 {job['attempts']}  {job['error'] or ''}")
+    elif args.command == "fetch":
+        os.makedirs(args.output, exist_ok=True)
+        for job_id in args.job_ids:
+            status, body = request(f"{args.server}/jobs/{job_id}", token=args.token)
+            job = json.loads(body)
+            if status != 200 or job.get("state") != "done":
+                print(f"{job_id}: 结果尚未生成")
+                continue
+            status, data = request(f"{args.server}/jobs/{job_id}/result", token=args.token)
+            # 结果文件名来自服务器，只使用文件名部分
+            result_name = safe_name(job["result_name"])
+            with open(os.path.join(args.output, result_name), "wb") as f:
+                f.write(data)
+            print(f"{job_id}: 已保存 {result_name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())